@@ -0,0 +1,65 @@
+"""
+Benchmark of xml_to_xsd.schema_inferer.infer_type against the original implementation,
+which compiled its patterns on every call and tried date, dateTime, integer and decimal
+in turn for every value.
+
+Run from the repository root:
+    python -m benchmarks.bench_infer_type
+"""
+import random
+import re
+import timeit
+from xml_to_xsd.schema_inferer import infer_type, infer_types
+
+def infer_type_original(text):
+    if isinstance(text, bool):
+        return "xs:boolean"
+    if not isinstance(text, str):
+        text = str(text)
+    cleaned_text = text.strip('\'"')
+    date_pattern = r"^\d{4}-\d{2}-\d{2}$"
+    datetime_pattern = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}([+-]\d{2}:\d{2}|Z)?$"
+    if re.match(date_pattern, cleaned_text):
+        return "xs:date"
+    elif re.match(datetime_pattern, cleaned_text):
+        return "xs:dateTime"
+    elif cleaned_text.isdigit():
+        return "xs:integer"
+    elif re.match(r"^\d+\.\d+$", cleaned_text):
+        return "xs:decimal"
+    return "xs:string"
+
+def sample_values(count=100_000, seed=0):
+    """Leaf values shaped like the news feeds: mostly text, some numbers and dates."""
+    rnd = random.Random(seed)
+    makers = [
+        lambda: rnd.choice(["IT", "Newspaper", "Italia Oggi", "TECNOLOGIA & INNOVAZIONE", "false"]),
+        lambda: "Realizzare cibo con stampanti 3d " * rnd.randint(1, 20),
+        lambda: str(rnd.randint(0, 10 ** 7)),
+        lambda: f"{rnd.random() * 1000:.2f}",
+        lambda: f"2025-07-{rnd.randint(1, 28):02d}",
+        lambda: f"2025-07-{rnd.randint(1, 28):02d}T02:00:00",
+        lambda: f"{rnd.randint(1000000, 9999999)}2025073001010101020.pdf",
+        lambda: "",
+        lambda: None,
+    ]
+    weights = [40, 10, 15, 5, 5, 10, 5, 5, 5]
+    return [rnd.choices(makers, weights)[0]() for _ in range(count)]
+
+def main():
+    values = sample_values()
+    for value in set(values):
+        assert infer_type(value) == infer_type_original(value), value
+
+    runs = 5
+    original = min(timeit.repeat(lambda: [infer_type_original(v) for v in values], number=1, repeat=runs))
+    fast = min(timeit.repeat(lambda: [infer_type(v) for v in values], number=1, repeat=runs))
+    batch = min(timeit.repeat(lambda: infer_types(values), number=1, repeat=runs))
+
+    print(f"{len(values)} values, best of {runs}")
+    print(f"original infer_type: {original * 1000:8.1f} ms")
+    print(f"infer_type:          {fast * 1000:8.1f} ms  ({original / fast:.1f}x)")
+    print(f"infer_types (batch): {batch * 1000:8.1f} ms  ({original / batch:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Benchmark of the explicit-stack document walkers against the recursive implementations
+they replaced: JSON key extraction and schema inference, XML path extraction and
+content model inference. Each is timed on a wide document (many shallow records) and a
+deep one (a single chain nested 900 levels, just under the recursion limit); the
+iterative walkers are then run on a chain far deeper than recursion allows. Path
+strings grow with depth, so very deep chains cost quadratic memory either way.
+
+The recursive references do the same work as the current walkers: they record the
+occurrence flags (KeyPresence, OccurrenceTracker) and json_to_schema's absent keys, so
+only the traversal differs.
+
+Run from the repository root:
+    python -m benchmarks.bench_traversal
+"""
+import json
+import sys
+import timeit
+from lxml import etree
+from json_to_schema.checksum_generator import (ABSENT_FLAG, KeyPresence, absent_key_paths, extract_keys_from_json,
+                                               extract_keys_from_json_legacy)
+from json_to_schema.json_schema_generator import json_to_schema
+from xml_to_xsd.checksum_generator import (OccurrenceTracker, extract_elements_from_xml,
+                                           extract_elements_from_xml_legacy, local_name)
+from xml_to_xsd.content_model import ContentModelBuilder, infer_model_from_element
+
+DEEP = 900
+VERY_DEEP = 5_000
+
+# === Recursive implementations (before the explicit-stack walkers) ===
+
+def extract_keys_recursive(obj, optional_fields, allow_null_fields):
+    keys = set()
+    presence = KeyPresence()
+
+    def recurse(o, path=""):
+        if isinstance(o, dict):
+            presence.add_object(path)
+            for k, v in o.items():
+                full_key = f"{path}.{k}" if path else k
+                if full_key in optional_fields:
+                    full_key += "0"
+                if full_key in allow_null_fields:
+                    full_key += "1"
+                keys.add(full_key)
+                presence.add_key(path, full_key)
+                if isinstance(v, (dict, list)):
+                    recurse(v, full_key)
+        elif isinstance(o, list):
+            for item in o:
+                if isinstance(item, (dict, list)):
+                    recurse(item, path)
+
+    recurse(obj)
+    keys.update(f"{key_path}{ABSENT_FLAG}" for key_path in presence.sometimes_absent())
+    return keys
+
+def json_to_schema_recursive(json_obj, optional_fields=frozenset(), allow_null_fields=frozenset(),
+                             exclude_fields=frozenset()):
+    absent_keys = absent_key_paths(extract_keys_recursive(json_obj, optional_fields, allow_null_fields))
+
+    def checksum_key(key_path, key):
+        full_key = f"{key_path}.{key}" if key_path else key
+        if full_key in optional_fields:
+            full_key += "0"
+        if full_key in allow_null_fields:
+            full_key += "1"
+        return full_key
+
+    def infer_type(key, value, path="", key_path=None):
+        current_path = f"{path}.{key}" if path and key else key or path
+        if absent_keys and key is not None:
+            key_path = checksum_key(key_path, key)
+        if current_path in exclude_fields:
+            return None
+        if isinstance(value, str):
+            base_type = {"type": "string"}
+        elif isinstance(value, bool):
+            base_type = {"type": "boolean"}
+        elif isinstance(value, (int, float)):
+            base_type = {"type": "number"}
+        elif isinstance(value, list):
+            base_type = {"type": "array"}
+            item_schemas = {}
+            for item in value:
+                item_schema = infer_type(None, item, current_path, key_path)
+                if item_schema:
+                    item_schemas.setdefault(json.dumps(item_schema, sort_keys=True), item_schema)
+            item_schemas = list(item_schemas.values())
+            if item_schemas:
+                base_type["items"] = item_schemas[0] if len(item_schemas) == 1 else {"anyOf": item_schemas}
+        elif isinstance(value, dict):
+            props, reqs = {}, []
+            for k, v in value.items():
+                inferred = infer_type(k, v, current_path, key_path)
+                if inferred is not None:
+                    props[k] = inferred
+                    full_key = f"{current_path}.{k}" if current_path else k
+                    if full_key not in optional_fields and not (absent_keys and checksum_key(key_path, k) in absent_keys):
+                        reqs.append(k)
+            result = {"type": "object", "properties": props}
+            if reqs:
+                result["required"] = reqs
+            return result
+        else:
+            base_type = {"type": "null"}
+        if current_path in allow_null_fields and base_type["type"] != "null":
+            base_type = {"anyOf": [base_type, {"type": "null"}]}
+        return base_type
+
+    return {k: infer_type(k, v) for k, v in json_obj.items()}
+
+def extract_elements_recursive(root):
+    elements = set()
+    occurrences = OccurrenceTracker()
+
+    def recurse(element, path=""):
+        tag = element.tag
+        if not isinstance(tag, str):
+            return
+        tag_name = local_name(tag)
+        full_path = f"{path}.{tag_name}" if path else tag_name
+        elements.add(full_path)
+        for attr_name in element.keys():
+            elements.add(f"{full_path}@{attr_name}")
+        occurrences.start(full_path)
+        for child in element:
+            recurse(child, full_path)
+        occurrences.end()
+
+    recurse(root)
+    elements |= occurrences.flags()
+    return elements
+
+def infer_model_recursive(element):
+    builder = ContentModelBuilder()
+
+    def walk(el):
+        builder.start(el.tag, el.items())
+        for child in el:
+            if isinstance(child.tag, str):
+                walk(child)
+        builder.end(el.text)
+
+    walk(element)
+    return builder.root
+
+# === Documents ===
+
+def wide_json(records=5_000):
+    return {"items": [{"id": i, "name": f"n{i}", "tags": ["a", "b"], "geo": {"lat": 1.5, "lon": 2.5}}
+                      for i in range(records)]}
+
+def deep_json(depth):
+    doc = {"leaf": 1}
+    for i in range(depth):
+        doc = {f"k{i % 7}": doc, "n": i}
+    return doc
+
+def wide_xml(records=5_000):
+    root = etree.Element("feed")
+    for i in range(records):
+        item = etree.SubElement(root, "item", id=str(i))
+        etree.SubElement(item, "name").text = f"n{i}"
+        etree.SubElement(item, "price").text = "1.5"
+    return root
+
+def deep_xml(depth):
+    root = element = etree.Element("n0")
+    for i in range(1, depth):
+        element = etree.SubElement(element, f"n{i % 7}", level=str(i))
+    element.text = "leaf"
+    return root
+
+def bench(label, recursive, iterative, doc, number):
+    t_rec = min(timeit.repeat(lambda: recursive(doc), number=number, repeat=5)) / number
+    t_it = min(timeit.repeat(lambda: iterative(doc), number=number, repeat=5)) / number
+    print(f"{label:<34} recursive {t_rec * 1e3:8.2f} ms   iterative {t_it * 1e3:8.2f} ms   "
+          f"({t_rec / t_it:.2f}x)")
+
+def main():
+    no_fields = frozenset()
+    cases = [
+        ("extract_keys_from_json  wide", lambda d: extract_keys_recursive(d, no_fields, no_fields),
+         lambda d: extract_keys_from_json(d, no_fields, no_fields), wide_json(), 20),
+        ("extract_keys_from_json  deep", lambda d: extract_keys_recursive(d, no_fields, no_fields),
+         lambda d: extract_keys_from_json(d, no_fields, no_fields), deep_json(DEEP), 200),
+        ("json_to_schema          wide", json_to_schema_recursive, json_to_schema, wide_json(), 5),
+        ("json_to_schema          deep", json_to_schema_recursive, json_to_schema, deep_json(DEEP), 50),
+        ("extract_elements_from_xml wide", extract_elements_recursive, extract_elements_from_xml, wide_xml(), 20),
+        ("extract_elements_from_xml deep", extract_elements_recursive, extract_elements_from_xml, deep_xml(DEEP), 200),
+        ("infer_model_from_element wide", infer_model_recursive, infer_model_from_element, wide_xml(), 5),
+        ("infer_model_from_element deep", infer_model_recursive, infer_model_from_element, deep_xml(DEEP), 50),
+    ]
+    print(f"Python recursion limit: {sys.getrecursionlimit()}")
+    for case in cases:
+        bench(*case)
+
+    print(f"\nNesting depth {VERY_DEEP}:")
+    very_deep_json, very_deep_xml = deep_json(VERY_DEEP), deep_xml(VERY_DEEP)
+    for label, walker, doc in [
+        ("extract_keys_from_json", lambda d: extract_keys_from_json(d, no_fields, no_fields), very_deep_json),
+        ("json_to_schema", json_to_schema, very_deep_json),
+        ("extract_elements_from_xml", extract_elements_from_xml, very_deep_xml),
+        ("infer_model_from_element", infer_model_from_element, very_deep_xml),
+        ("extract_keys_from_json_legacy", lambda d: extract_keys_from_json_legacy(d, no_fields, no_fields),
+         very_deep_json),
+        ("extract_elements_from_xml_legacy", extract_elements_from_xml_legacy, very_deep_xml),
+        ("recursive extract_keys", lambda d: extract_keys_recursive(d, no_fields, no_fields), very_deep_json),
+        ("recursive json_to_schema", json_to_schema_recursive, very_deep_json),
+        ("recursive extract_elements", extract_elements_recursive, very_deep_xml),
+        ("recursive infer_model", infer_model_recursive, very_deep_xml),
+    ]:
+        try:
+            walker(doc)
+            print(f"{label:<34} ok")
+        except RecursionError:
+            print(f"{label:<34} RecursionError")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,106 @@
 import json
 import hashlib
+from schema_utils.events import DEBUG, get_logger
+
+_log = get_logger(__name__)
+
+# Suffix of the flag recording that a key is missing from some objects at its path
+ABSENT_FLAG = "?"
+
+class KeyPresence:
+    """
+    Counts the objects found at each path and how many of them contain each key.
+
+    A key that some of those objects lack, e.g. one element of an array of objects, is
+    "sometimes absent". The flag is part of the checksum because the generated schema
+    does not require such keys. Memory grows with the number of distinct paths.
+    """
+
+    __slots__ = ("objects", "containing", "parents", "_counted_in")
+
+    def __init__(self):
+        self.objects = {}       # object path -> number of objects
+        self.containing = {}    # key path -> number of objects containing the key
+        self.parents = {}       # key path -> object path
+        self._counted_in = {}   # key path -> number of the object it was last counted for
+
+    def add_object(self, path):
+        self.objects[path] = self.objects.get(path, 0) + 1
+
+    def add_key(self, path, key_path):
+        """Record key_path in the latest object at path; duplicate keys count once."""
+        number = self.objects[path]
+        if self._counted_in.get(key_path) != number:
+            self._counted_in[key_path] = number
+            self.containing[key_path] = self.containing.get(key_path, 0) + 1
+            self.parents[key_path] = path
+
+    def sometimes_absent(self):
+        """Return the key paths missing from at least one object at their parent path."""
+        return {key_path for key_path, count in self.containing.items()
+                if count < self.objects[self.parents[key_path]]}
 
 def extract_keys_from_json(obj, optional_fields, allow_null_fields):
+    """
+    Collect the structural key paths of a JSON document as a set.
+
+    Array elements share their array's path, so each distinct path is recorded once no
+    matter how many elements contain it; cost in memory and hashing grows with the number
+    of distinct paths rather than with the size of the document. Optional and nullable
+    paths get a "0" / "1" suffix so that config changes produce a different checksum, and
+    keys missing from some objects at their path get an extra "<path>?" entry.
+    Containers are walked from an explicit stack, so nesting depth is not limited by
+    Python's recursion limit.
+    """
+    keys = set()
+    presence = KeyPresence()
+    # Containers still to visit, with the path of their parent key
+    stack = [(obj, "")]
+
+    while stack:
+        o, path = stack.pop()
+        if isinstance(o, dict):
+            presence.add_object(path)
+            for k, v in o.items():
+                full_key = f"{path}.{k}" if path else k
+
+                if full_key in optional_fields:
+                    full_key += "0"
+                if full_key in allow_null_fields:
+                    full_key += "1"
+
+                keys.add(full_key)
+                presence.add_key(path, full_key)
+
+                if isinstance(v, (dict, list)):
+                    stack.append((v, full_key))
+        elif isinstance(o, list):
+            for item in o:
+                if isinstance(item, (dict, list)):
+                    stack.append((item, path))
+
+    keys.update(f"{key_path}{ABSENT_FLAG}" for key_path in presence.sometimes_absent())
+    if _log.isEnabledFor(DEBUG):
+        _log.debug("Checksum keys: %s", sorted(keys), extra={"event": "checksum.keys", "fields": {"count": len(keys)}})
+    return keys
+
+def absent_key_paths(keys):
+    """Return the key paths that a set of checksum keys flags as sometimes absent, with
+    their optional/nullable suffixes, e.g. {"items.b"} for {"items", "items.b", "items.b?"}"""
+    return {key[:-1] for key in keys if key.endswith(ABSENT_FLAG)}
+
+def extract_keys_from_json_legacy(obj, optional_fields, allow_null_fields):
+    """
+    Key extraction used before checksums were deduplicated: one entry per array element.
+    Only kept so that migrate_checksums can map old schema files to their new checksum.
+    Walked from an explicit stack like extract_keys_from_json; the checksum sorts the
+    keys, so the visiting order does not matter.
+    """
     keys = []
+    stack = [(obj, "")]
 
-    def recurse(o, path=""):
+    while stack:
+        o, path = stack.pop()
         if isinstance(o, dict):
             for k in sorted(o):
                 full_key = f"{path}.{k}" if path else k
@@ -15,14 +111,10 @@ def extract_keys_from_json(obj, optional_fields, allow_null_fields):
                     full_key += "1"
 
                 keys.append(full_key)
-                
-                recurse(o[k], full_key)
+                stack.append((o[k], full_key))
         elif isinstance(o, list):
-            for item in o:
-                recurse(item, path)
+            stack.extend((item, path) for item in o)
 
-    recurse(obj)
-    print(keys)
     return keys
 
 def generate_checksum_from_keys(key_list):
@@ -31,4 +123,8 @@ def generate_checksum_from_keys(key_list):
 
 def get_json_checksum(data, optional_fields, allow_null_fields):
     keys = extract_keys_from_json(data, optional_fields, allow_null_fields)
-    return generate_checksum_from_keys(keys)
\ No newline at end of file
+    return generate_checksum_from_keys(keys)
+
+def get_legacy_json_checksum(data, optional_fields, allow_null_fields):
+    keys = extract_keys_from_json_legacy(data, optional_fields, allow_null_fields)
+    return generate_checksum_from_keys(keys)
@@ -1,52 +1,223 @@
 import json
-from .checksum_generator import get_json_checksum
-import os
+import random
+from .checksum_generator import absent_key_paths, extract_keys_from_json, generate_checksum_from_keys
+from .streaming_checksum import extract_keys_streaming
+from schema_utils.config_index import resolve_config
+from schema_utils.events import INFO, WARNING, ERROR, get_logger, log_event
+from schema_utils.schema_cache import get_schema_cache
+from schema_utils.schema_store import open_store
+from schema_utils.single_flight import schema_generation
+
+_log = get_logger(__name__)
+
+# === Array Sampling ===
+
+ARRAY_SAMPLING_STRATEGIES = ("first", "reservoir", "stride")
+
+def normalize_array_sampling(settings):
+    """Validate an "array_sampling" config value, returning None if sampling is off or invalid"""
+    if not settings:
+        return None
+    try:
+        base = {
+            "strategy": settings.get("strategy", "first"),
+            "size": int(settings.get("size", 100)),
+            "seed": int(settings.get("seed", 0)),
+            "full_scan_on_mismatch": bool(settings.get("full_scan_on_mismatch", True)),
+        }
+        paths = {}
+        for path, override in (settings.get("paths") or {}).items():
+            merged = dict(base)
+            if override:
+                merged.update(override)
+                merged["size"] = int(merged["size"])
+                merged["seed"] = int(merged["seed"])
+            paths[path] = merged if override is not None else None
+    except (AttributeError, TypeError, ValueError) as e:
+        log_event(_log, WARNING, "config.invalid_sampling", "⚠️  Warning: Ignoring invalid array_sampling %r: %s",
+                  settings, e)
+        return None
+
+    for option in [base, *(o for o in paths.values() if o)]:
+        if option["strategy"] not in ARRAY_SAMPLING_STRATEGIES or option["size"] < 1:
+            log_event(_log, WARNING, "config.invalid_sampling", "⚠️  Warning: Ignoring invalid array_sampling %r",
+                      settings)
+            return None
+    base["paths"] = paths
+    return base
+
+def sample_array(items, strategy, size, seed=0):
+    """Return at most size items of a list, in their original order"""
+    if len(items) <= size:
+        return items
+    if strategy == "first":
+        return items[:size]
+    if strategy == "stride":
+        step = -(-len(items) // size)
+        return items[::step]
+    # Uniform sample of positions, seeded so the same file always yields the same schema
+    positions = random.Random(seed).sample(range(len(items)), size)
+    return [items[i] for i in sorted(positions)]
 
 # === Schema Generator ===
 
-def json_to_schema(json_obj, optional_fields=None, allow_null_fields=None, exclude_fields=None) -> dict:
+class ObjectFrame:
+    """An object whose properties json_to_schema is still inferring."""
+
+    __slots__ = ("path", "key_path", "children", "properties", "required", "property_ids", "key", "child_path",
+                 "child_key_path")
+
+    def __init__(self, path, key_path, value):
+        self.path = path
+        self.key_path = key_path  # path as spelled in the checksum keys, if absent keys are tracked
+        self.children = iter(value.items())
+        self.properties = {}
+        self.required = []
+        self.property_ids = []   # (key, schema id) of each property, for hash-consing
+        self.key = None          # key of the property being inferred
+        self.child_path = None   # and its path
+        self.child_key_path = None
+
+class ArrayFrame:
+    """An array whose item schemas json_to_schema is still inferring."""
+
+    __slots__ = ("path", "key_path", "children", "item_schemas", "items", "sampling", "sampled")
+
+    def __init__(self, path, key_path, items, sampling):
+        self.path = path
+        self.key_path = key_path
+        self.items = items       # every item, for a full scan when the sample was mixed
+        self.sampling = sampling
+        self.sampled = bool(sampling) and len(items) > sampling["size"]
+        self.children = iter(sample_array(items, sampling["strategy"], sampling["size"], sampling["seed"])
+                             if self.sampled else items)
+        self.item_schemas = {}   # schema id -> item schema
+
+def json_to_schema(json_obj, optional_fields=None, allow_null_fields=None, exclude_fields=None,
+                   array_sampling=None, absent_keys=None) -> dict:
+    """Infer a draft-07 schema for json_obj. array_sampling is a file's "array_sampling"
+    config; when set, long arrays are inferred from a sample of their items. A key is
+    required only if every object at its path contains it, in the whole document and
+    not just the sample, so every document sharing the checksum validates. Those keys
+    come from the checksum pass: pass absent_key_paths(keys) of the document's checksum
+    keys as absent_keys, or leave it None to walk the whole document for them here."""
     optional_fields = set(optional_fields or [])
     allow_null_fields = set(allow_null_fields or [])
     exclude_fields = set(exclude_fields or [])
+    array_sampling = normalize_array_sampling(array_sampling)
+    if absent_keys is None:
+        absent_keys = absent_key_paths(extract_keys_from_json(json_obj, optional_fields, allow_null_fields))
+
+    def checksum_key(key_path, key):
+        """Path of key as spelled in the checksum keys, i.e. extract_keys_from_json"""
+        full_key = f"{key_path}.{key}" if key_path else key
+        if full_key in optional_fields:
+            full_key += "0"
+        if full_key in allow_null_fields:
+            full_key += "1"
+        return full_key
+
+    # Structurally equal schemas share one id (hash-consing), so array item schemas are
+    # deduplicated in O(1) without serialising or deep-comparing them
+    schema_ids = {}
+    scalar_ids = {name: schema_ids.setdefault((name,), len(schema_ids))
+                  for name in ("string", "boolean", "number", "null")}
 
     def infer_type(key, value, path=""):
+        """Schema of value, or None if its path is excluded. Containers are walked from an
+        explicit stack of ObjectFrames and ArrayFrames, so nesting depth is not limited by
+        the recursion limit."""
+        stack = []
+        exhausted = object()
         current_path = f"{path}.{key}" if path and key else key or path
-        if current_path in exclude_fields:
-            return None
-        if isinstance(value, str):
-            base_type = {"type": "string"}
-        elif isinstance(value, bool):
-            base_type = {"type": "boolean"}
-        elif isinstance(value, int) or isinstance(value, float):
-            base_type = {"type": "number"}
-        elif isinstance(value, list):
-            base_type = {"type": "array"}
-            item_schemas = []
-            for item in value:
-                item_schema = infer_type(None, item, current_path)
-                if item_schema and item_schema not in item_schemas:
-                    item_schemas.append(item_schema)
-            if item_schemas:
-                base_type["items"] = item_schemas[0] if len(item_schemas) == 1 else {"anyOf": item_schemas}
-        elif isinstance(value, dict):
-            props, reqs = {}, []
-            for k, v in value.items():
-                inferred = infer_type(k, v, current_path)
-                if inferred is not None:
-                    props[k] = inferred
-                    full_key = f"{current_path}.{k}" if current_path else k
-                    if full_key not in optional_fields:
-                        reqs.append(k)
-            result = {"type": "object", "properties": props}
-            if reqs:
-                result["required"] = reqs
-            return result
-        else:
-            base_type = {"type": "null"}
+        # Only needed to look up absent keys, which most documents have none of
+        key_path = checksum_key(path, key) if absent_keys else None
+
+        while True:
+            # Descend into value: scalars are finished at once, containers push a frame
+            node = None
+            finished = True
+            if current_path in exclude_fields:
+                pass
+            elif isinstance(value, dict):
+                stack.append(ObjectFrame(current_path, key_path, value))
+                finished = False
+            elif isinstance(value, list):
+                sampling = array_sampling and array_sampling["paths"].get(current_path, array_sampling)
+                stack.append(ArrayFrame(current_path, key_path, value, sampling))
+                finished = False
+            else:
+                if isinstance(value, str):
+                    base_type = {"type": "string"}
+                elif isinstance(value, bool):
+                    base_type = {"type": "boolean"}
+                elif isinstance(value, (int, float)):
+                    base_type = {"type": "number"}
+                else:
+                    base_type = {"type": "null"}
+                node = nullable(current_path, base_type, scalar_ids[base_type["type"]])
+
+            # Hand finished nodes to their parent frame until one has another child to visit
+            while True:
+                if finished:
+                    if not stack:
+                        return node and node[0]
+                    frame = stack[-1]
+                    if node is not None:
+                        schema, schema_id = node
+                        if isinstance(frame, ObjectFrame):
+                            k, child_path = frame.key, frame.child_path
+                            frame.properties[k] = schema
+                            frame.property_ids.append((k, schema_id))
+                            if k == "":
+                                # An empty key leaves current_path unchanged, but not the required check
+                                child_path = f"{frame.path}." if frame.path else k
+                            if child_path not in optional_fields and frame.child_key_path not in absent_keys:
+                                frame.required.append(k)
+                        else:
+                            frame.item_schemas.setdefault(schema_id, schema)
+
+                frame = stack[-1]
+                child = next(frame.children, exhausted)
+                if child is not exhausted:
+                    if isinstance(frame, ObjectFrame):
+                        key, value = child
+                        current_path = f"{frame.path}.{key}" if frame.path and key else key or frame.path
+                        if absent_keys:
+                            key_path = checksum_key(frame.key_path, key)
+                        frame.key, frame.child_path, frame.child_key_path = key, current_path, key_path
+                    else:
+                        value = child
+                        current_path, key_path = frame.path, frame.key_path
+                    break
 
+                finished = True
+                if isinstance(frame, ObjectFrame):
+                    stack.pop()
+                    result = {"type": "object", "properties": frame.properties}
+                    if frame.required:
+                        result["required"] = frame.required
+                    # Objects are never wrapped as nullable
+                    node = (result, schema_ids.setdefault(
+                        ("object", tuple(sorted(frame.property_ids)), tuple(frame.required)), len(schema_ids)))
+                elif frame.sampled and len(frame.item_schemas) > 1 and frame.sampling["full_scan_on_mismatch"]:
+                    # Mixed items: the sample may have missed a variant, so scan them all
+                    frame.children, frame.item_schemas, frame.sampled = iter(frame.items), {}, False
+                    finished = False
+                else:
+                    stack.pop()
+                    base_type = {"type": "array"}
+                    item_schemas = list(frame.item_schemas.values())
+                    if item_schemas:
+                        base_type["items"] = item_schemas[0] if len(item_schemas) == 1 else {"anyOf": item_schemas}
+                    node = nullable(frame.path, base_type,
+                                    schema_ids.setdefault(("array", tuple(frame.item_schemas)), len(schema_ids)))
+
+    def nullable(current_path, base_type, schema_id):
         if current_path in allow_null_fields and base_type["type"] != "null":
-            base_type = {"anyOf": [base_type, {"type": "null"}]}
-        return base_type
+            return ({"anyOf": [base_type, {"type": "null"}]},
+                    schema_ids.setdefault(("nullable", schema_id), len(schema_ids)))
+        return base_type, schema_id
 
     properties, required_fields = {}, []
     for k, v in json_obj.items():
@@ -67,69 +238,102 @@ def json_to_schema(json_obj, optional_fields=None, allow_null_fields=None, exclu
 
     return schema
 
-# === Configuration Helper ===
-
-def load_config(config_file):
-    """Load configuration file"""
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"⚠️  Warning: Could not load config file - {e}")
-    return []
-
-def get_file_config(filename, configs):
-    """Get configuration for a specific file"""
-    for config in configs:
-        if config.get("file") == filename:
-            return config
-    return {}
-
 # === File Processing ===
-def json_schema_generator(json_path, json_schema_path, config_file = None):
-    filename = json_path.split("/")[-1]
-    
-    # Get configuration for this file
-    optional_fields = []
-    allow_null_fields = []
-    if config_file:
-        configs = load_config(config_file)
-        file_config = get_file_config(filename, configs)
-        optional_fields = file_config.get("optional_fields", [])
-        allow_null_fields = file_config.get("allow_null_fields", [])
-    
-    # Load JSON
+def load_json(json_path):
+    """Load a JSON file, returning None if it is not valid JSON"""
     try:
         with open(json_path, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
+            return json.load(f)
     except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in {json_path}: {e}")
+        log_event(_log, ERROR, "input.invalid", "❌ Invalid JSON in %s: %s", json_path, e, file=json_path)
+        return None
+
+def json_schema_generator(json_path, json_schema_path, config_file = None, streaming = False):
+    """Generate or load the schema for a JSON file. With streaming=True the checksum is
+    computed from the token stream and the document is only parsed on a cache miss."""
+    if streaming:
+        filename = json_path.split("/")[-1]
+        optional_fields, allow_null_fields = resolve_config(config_file).get_fields(filename)
+        keys = extract_keys_streaming(json_path, optional_fields, allow_null_fields)
+        return generate_json_schema(None, json_path, json_schema_path, config_file, generate_checksum_from_keys(keys),
+                                    absent_key_paths(keys))
+
+    json_data = load_json(json_path)
+    if json_data is None:
         return False
+    return generate_json_schema(json_data, json_path, json_schema_path, config_file)
+
+def generate_json_schema(json_data, json_path, json_schema_path, config_file = None, checksum_id = None,
+                         absent_keys = None):
+    """Generate or load the schema for already parsed JSON data read from json_path.
+    json_schema_path is a schema directory, a .sqlite/.sqlite3/.db database or a SchemaStore.
+    config_file may be a path or a CompiledConfig; paths are loaded once per process.
+    If checksum_id is already known, json_data may be None and is loaded only on a miss;
+    pass the absent_key_paths of its checksum keys as absent_keys too, or a miss walks
+    the whole document again to find them."""
+    filename = json_path.split("/")[-1]
+    
+    # Get configuration for this file
+    config = resolve_config(config_file)
+    optional_fields, allow_null_fields = config.get_fields(filename)
     
     # Generate checksum
-    checksum_id = get_json_checksum(json_data, optional_fields, allow_null_fields)
+    if checksum_id is None:
+        keys = extract_keys_from_json(json_data, optional_fields, allow_null_fields)
+        checksum_id = generate_checksum_from_keys(keys)
+        absent_keys = absent_key_paths(keys)
     
     # Schema file path based on checksum ID
-    schema_file_path = os.path.join(json_schema_path, f"{checksum_id}.json")
-    print(f"📄 JSON: {json_path} | 📁 Schema: {schema_file_path}")
+    store = open_store(json_schema_path, ".json")
+    schema_cache = get_schema_cache()
+    schema_file_path = store.path_for(checksum_id)
+    log_event(_log, INFO, "schema.lookup", "📄 JSON: %s | 📁 Schema: %s", json_path, schema_file_path,
+              file=json_path, checksum=checksum_id)
     
+    existing_schema = load_cached_schema(schema_cache, store, checksum_id)
+    if existing_schema is not None:
+        return existing_schema
+
+    def generate():
+        # Only one process generates a given checksum; the others wait and then load its result
+        with store.lock(checksum_id):
+            # Another process may have stored it meanwhile; a corrupt entry was already
+            # reported by the lookup outside the lock
+            existing_schema = load_cached_schema(schema_cache, store, checksum_id, report=False)
+            if existing_schema is not None:
+                return existing_schema
+
+            data = load_json(json_path) if json_data is None else json_data
+            if data is None:
+                return False
+
+            schema_data = json_to_schema(data, optional_fields, allow_null_fields,
+                                         array_sampling=config.get_file_config(filename).get("array_sampling"),
+                                         absent_keys=absent_keys)
+            schema_data["checksum_id"] = checksum_id
+
+            try:
+                schema_cache.save(store, checksum_id, json.dumps(schema_data, indent=2).encode("utf-8"), schema_data)
+                log_event(_log, INFO, "schema.generated", "✅ New schema generated and saved.", checksum=checksum_id)
+            except (OSError, TypeError, ValueError) as e:
+                log_event(_log, ERROR, "schema.write_failed", "❌ Failed to write schema: %s", e, checksum=checksum_id)
+                return False
+            return schema_data
+
+    # Threads of this process missing on the same checksum share one generation
+    return schema_generation.do((store.key, checksum_id), generate)
+
+def load_cached_schema(schema_cache, store, checksum_id, report=True):
+    """Return the cached schema for checksum_id, or None; unreadable or corrupt entries count
+    as misses and are logged unless report is False"""
     try:
-        with open(schema_file_path, "r", encoding="utf-8") as f:
-            existing_schema = json.load(f)
-            print("✅ Existing schema loaded.")
-            return existing_schema
-        
-    except:
-        schema_data = json_to_schema(json_data, optional_fields, allow_null_fields)
-        schema_data["checksum_id"] = checksum_id
-        
-        try:
-            with open(schema_file_path, "w", encoding="utf-8") as f:
-                json.dump(schema_data, f, indent=2)
-                print("✅ New schema generated and saved.")
-        except Exception as e:
-            print(f"❌ Failed to write schema: {e}")
-            return False
-        
-        return schema_data
\ No newline at end of file
+        existing_schema = schema_cache.load(store, checksum_id, json.loads)
+    except (OSError, ValueError) as e:
+        if not report:
+            return None
+        log_event(_log, WARNING, "schema.read_failed", "⚠️  Warning: Ignoring unreadable schema: %s", e,
+                  checksum=checksum_id)
+        return None
+    if existing_schema is not None:
+        log_event(_log, INFO, "schema.hit", "✅ Existing schema loaded.", checksum=checksum_id)
+    return existing_schema
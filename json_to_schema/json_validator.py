@@ -1,23 +1,61 @@
 import json
 from jsonschema import Draft7Validator
+from schema_utils.events import WARNING, ERROR, get_logger, log_event
+from schema_utils.lru_cache import LRUCache
+
+_log = get_logger(__name__)
+
+# Prepared validators keyed by the schema's checksum_id, shared by every call in this process.
+# Checksums are only unique within one schema store, so a hit is used only for the same schema.
+validator_cache = LRUCache(maxsize=128)
+
+def _build_validator(schema_obj):
+    Draft7Validator.check_schema(schema_obj)
+    return Draft7Validator(schema_obj)
+
+def get_validator(schema_obj):
+    """Return a Draft7Validator for the schema, reusing a cached one when it carries a checksum_id.
+    The cached validator is only reused for the same schema: schemas served by the schema
+    cache are shared objects, so this is normally an identity check, and another store's
+    schema with the same checksum_id but different content replaces the cached validator."""
+    checksum_id = schema_obj.get("checksum_id") if isinstance(schema_obj, dict) else None
+    if checksum_id is None:
+        return _build_validator(schema_obj)
+    validator = validator_cache.get(checksum_id)
+    if validator is None or (validator.schema is not schema_obj and validator.schema != schema_obj):
+        validator = _build_validator(schema_obj)
+        validator_cache.put(checksum_id, validator)
+    return validator
+
+def get_validator_cache_stats():
+    """Return size, hit, miss and eviction counters of the validator cache"""
+    return validator_cache.stats()
 
 def json_validator(json_path, schema_obj):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             json_obj = json.load(f)
+    except Exception as e:
+        log_event(_log, ERROR, "validation.error", "Error: %s", e, file=json_path)
+        return False
+
+    return validate_json(json_obj, schema_obj)
 
-        validator = Draft7Validator(schema_obj)
+def validate_json(json_obj, schema_obj):
+    """Validate already parsed JSON data against a schema"""
+    try:
+        validator = get_validator(schema_obj)
         errors = sorted(validator.iter_errors(json_obj), key=lambda e: e.path)
 
         if not errors:
             return True
 
-        print("❌ JSON validation failed:\n")
-        for error in errors:
-            path = ".".join(str(x) for x in error.path) or "root"
-            print(f"[{path}] {error.message}")
+        if _log.isEnabledFor(WARNING):
+            lines = [f"[{'.'.join(str(x) for x in error.path) or 'root'}] {error.message}" for error in errors]
+            log_event(_log, WARNING, "validation.failed", "❌ JSON validation failed:\n\n%s", "\n".join(lines),
+                      errors=lines)
         return False
 
     except Exception as e:
-        print("Error:", e)
-        return False
\ No newline at end of file
+        log_event(_log, ERROR, "validation.error", "Error: %s", e)
+        return False
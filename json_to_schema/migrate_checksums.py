@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+from .checksum_generator import absent_key_paths, extract_keys_from_json, generate_checksum_from_keys, get_legacy_json_checksum
+from .json_schema_generator import generate_json_schema, load_json
+from schema_utils.config_index import resolve_config
+from schema_utils.disk_store import DiskStore
+
+# === Checksum Migration ===
+#
+# Checksums used to count one key path per array element, so documents with the same
+# structure but different array lengths got different checksums. They are now built from
+# the set of distinct paths. Documents without repeated array elements keep their old
+# checksum; for the others this tool copies each existing schema to its new checksum name
+# so that the cache keeps hitting. Legacy schemas require every key of each array item
+# variant, so a document with keys missing from some array elements only fits its own
+# legacy schema; for those the schema of the new checksum is generated instead. Old files
+# are left in place and can be deleted once no older deployment reads the directory.
+
+def migrate_json_schemas(json_dir, json_schema_path, config_file=None):
+    """Copy schemas stored under legacy checksums of the files in json_dir to their new checksum,
+    or generate the new schema where the legacy one does not fit every document sharing it.
+    Returns a list of (old_checksum, new_checksum) pairs that were migrated."""
+    config = resolve_config(config_file)
+    store = DiskStore(json_schema_path, ".json")
+    migrated = []
+    seen = set()
+
+    for filename in sorted(os.listdir(json_dir)):
+        if not filename.endswith(".json"):
+            continue
+        json_path = os.path.join(json_dir, filename)
+        json_data = load_json(json_path)
+        if json_data is None:
+            continue
+
+        optional_fields, allow_null_fields = config.get_fields(filename)
+        old_checksum = get_legacy_json_checksum(json_data, optional_fields, allow_null_fields)
+        new_keys = extract_keys_from_json(json_data, optional_fields, allow_null_fields)
+        new_checksum = generate_checksum_from_keys(new_keys)
+        if old_checksum == new_checksum or (old_checksum, new_checksum) in seen:
+            continue
+        seen.add((old_checksum, new_checksum))
+
+        old_data = store.read(old_checksum)
+        if old_data is None or store.exists(new_checksum):
+            continue
+
+        absent_keys = absent_key_paths(new_keys)
+        if absent_keys:
+            generate_json_schema(json_data, json_path, store, config, new_checksum, absent_keys)
+            migrated.append((old_checksum, new_checksum))
+            continue
+
+        schema_data = json.loads(old_data)
+        schema_data["checksum_id"] = new_checksum
+        store.write(new_checksum, json.dumps(schema_data, indent=2).encode("utf-8"))
+        migrated.append((old_checksum, new_checksum))
+
+    return migrated
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m json_to_schema.migrate_checksums <json_dir> <json_schema_dir> [config_file]")
+        sys.exit(1)
+
+    pairs = migrate_json_schemas(*sys.argv[1:4])
+    for old_checksum, new_checksum in pairs:
+        print(f"{old_checksum} -> {new_checksum}")
+    print(f"✅ Migrated {len(pairs)} schema(s).")
@@ -0,0 +1,21 @@
+from .json_schema_generator import load_json, generate_json_schema
+from .json_validator import validate_json
+
+def json_pipeline(json_path, json_schema_path, config_file=None, json_data=None, checksum_id=None, absent_keys=None):
+    """
+    Generate (or load) the schema for a JSON file and validate the file against it,
+    parsing the file only once. Pass json_data, and optionally its checksum_id and
+    absent_keys (see generate_json_schema), if the file was already parsed.
+
+    Returns:
+    - tuple: (schema, result) where schema is False if the file could not be parsed.
+    """
+    if json_data is None:
+        json_data = load_json(json_path)
+        if json_data is None:
+            return False, False
+
+    schema = generate_json_schema(json_data, json_path, json_schema_path, config_file, checksum_id, absent_keys)
+    if not schema:
+        return schema, False
+    return schema, validate_json(json_data, schema)
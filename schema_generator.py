@@ -1,32 +1,177 @@
+import json
+import logging
+import multiprocessing
 import os
-from xml_to_xsd.xsd_generator import generate_xsd
-from xml_to_xsd.xml_validator import xml_validator
-from json_to_schema.json_schema_generator import json_schema_generator
-from json_to_schema.json_validator import json_validator
-
-def schema_generator(JSON_DIR, JSON_SCHEMA_DIR, XML_DIR, XSD_DIR, CONFIG_FILE):
-
-    # Get all JSON files in the json directory
-    json_files = []
-    xml_files = []
-
-    if os.path.exists(JSON_DIR):
-        for file in os.listdir(JSON_DIR):
-            if file.endswith('.json'):
-                json_files.append(file)
-
-    for filename in json_files:
-        schema = json_schema_generator(f"{JSON_DIR}/{filename}", JSON_SCHEMA_DIR, CONFIG_FILE)
-        result = json_validator(f"{JSON_DIR}/{filename}", schema)
-        
-    if os.path.exists(XML_DIR):
-        for file in os.listdir(XML_DIR):
-            if file.endswith('.xml'):
-                xml_files.append(file)
-
-    for filename in xml_files:
-        xsd_str = generate_xsd(f"{XML_DIR}/{filename}", XSD_DIR, CONFIG_FILE)
-        result = xml_validator(f"{XML_DIR}/{filename}", xsd_str)
+from concurrent.futures import ProcessPoolExecutor
+from xml_to_xsd.checksum_generator import get_xml_checksum
+from xml_to_xsd.pipeline import xml_pipeline
+from xml_to_xsd.xml_parser import load_xml
+from xml_to_xsd.xsd_generator import check_xsd_bytes
+from json_to_schema.checksum_generator import absent_key_paths, extract_keys_from_json, generate_checksum_from_keys
+from json_to_schema.json_schema_generator import load_json
+from json_to_schema.pipeline import json_pipeline
+from schema_utils.config_index import resolve_config
+from schema_utils.events import (ROOT_LOGGER_NAME, WARNING, configure_worker_logging, get_logger, listen_for_logs,
+                                 log_event)
+from schema_utils.schema_cache import get_schema_cache
+from schema_utils.schema_store import open_store
+
+_log = get_logger(__name__)
+
+# Files per batch whose cached schemas are fetched with one store lookup
+LOOKUP_BATCH = 64
+
+def list_files(directory, extension):
+    """Return the sorted names of all files in directory ending with extension."""
+    if not os.path.exists(directory):
+        return []
+    return sorted(file for file in os.listdir(directory) if file.endswith(extension))
+
+def process_json_file(json_path, json_schema_dir, config_file, json_data=None, checksum_id=None, absent_keys=None):
+    """Generate and validate the schema of one JSON file, returning its status record.
+    json_data, checksum_id and absent_keys may be passed if the file was already parsed."""
+    status = {"file": json_path, "type": "json", "valid": False, "error": None, "checksum": None}
+    try:
+        schema, result = json_pipeline(json_path, json_schema_dir, config_file, json_data, checksum_id, absent_keys)
+        if schema:
+            status["checksum"] = schema.get("checksum_id")
+            status["valid"] = result
+        else:
+            status["error"] = "Failed to generate JSON schema."
+    except Exception as e:
+        status["error"] = str(e)
+    return status
+
+def process_xml_file(xml_path, xsd_dir, config_file, loaded=None, checksum=None):
+    """Generate and validate the XSD of one XML file, returning its status record.
+    loaded and checksum may be passed if the file was already parsed."""
+    status = {"file": xml_path, "type": "xml", "valid": False, "error": None, "checksum": None}
+    try:
+        if checksum is None:
+            # Fingerprint here so the record carries the checksum; the pipeline reuses it
+            loaded = load_xml(xml_path) if loaded is None else loaded
+            if loaded is None:
+                status["error"] = "Failed to parse XML."
+                return status
+            optional_fields, allow_null_fields = resolve_config(config_file).get_fields(os.path.basename(xml_path))
+            checksum = get_xml_checksum(loaded[1], optional_fields, allow_null_fields)
+        status["checksum"] = checksum
+        schema, result = xml_pipeline(xml_path, xsd_dir, config_file, loaded, checksum)
+        if schema is None:
+            status["error"] = "Failed to parse XML."
+        status["valid"] = result
+    except Exception as e:
+        status["error"] = str(e)
+    return status
+
+def prefetch_schemas(schema_location, extension, checksums, decode=None):
+    """Load the stored schemas of a batch into the in-memory SchemaCache with a single
+    load_many call, i.e. one query on a SQLiteStore instead of one per file."""
+    try:
+        get_schema_cache().load_many(open_store(schema_location, extension), checksums, decode)
+    except Exception as e:
+        # Only an optimisation: the per-file lookups retry and report unreadable entries
+        log_event(_log, WARNING, "schema.prefetch_failed", "⚠️ Warning: Could not prefetch schemas: %s", e)
+
+def process_json_batch(json_paths, json_schema_dir, config_file):
+    """Parse and fingerprint a batch of JSON files, prefetch their schemas with one store
+    lookup, then generate and validate each; returns their status records."""
+    config = resolve_config(config_file)
+    parsed = []
+    for json_path in json_paths:
+        try:
+            json_data = load_json(json_path)
+        except Exception as e:
+            parsed.append((json_path, None, None, None, str(e)))
+            continue
+        if json_data is None:
+            parsed.append((json_path, None, None, None, "Failed to generate JSON schema."))
+            continue
+        optional_fields, allow_null_fields = config.get_fields(os.path.basename(json_path))
+        keys = extract_keys_from_json(json_data, optional_fields, allow_null_fields)
+        parsed.append((json_path, json_data, generate_checksum_from_keys(keys), absent_key_paths(keys), None))
+
+    prefetch_schemas(json_schema_dir, ".json", [checksum_id for _, _, checksum_id, _, _ in parsed if checksum_id],
+                     json.loads)
+    return [process_json_file(json_path, json_schema_dir, config, json_data, checksum_id, absent_keys)
+            if error is None else {"file": json_path, "type": "json", "valid": False, "error": error, "checksum": None}
+            for json_path, json_data, checksum_id, absent_keys, error in parsed]
+
+def process_xml_batch(xml_paths, xsd_dir, config_file):
+    """Parse and fingerprint a batch of XML files, prefetch their XSDs with one store
+    lookup, then generate and validate each; returns their status records."""
+    config = resolve_config(config_file)
+    parsed = []
+    for xml_path in xml_paths:
+        try:
+            loaded = load_xml(xml_path)
+        except Exception as e:
+            parsed.append((xml_path, None, None, str(e)))
+            continue
+        if loaded is None:
+            parsed.append((xml_path, None, None, "Failed to parse XML."))
+            continue
+        optional_fields, allow_null_fields = config.get_fields(os.path.basename(xml_path))
+        parsed.append((xml_path, loaded, get_xml_checksum(loaded[1], optional_fields, allow_null_fields), None))
+
+    prefetch_schemas(xsd_dir, ".xsd", [checksum for _, _, checksum, _ in parsed if checksum], check_xsd_bytes)
+    return [process_xml_file(xml_path, xsd_dir, config, loaded, checksum) if error is None
+            else {"file": xml_path, "type": "xml", "valid": False, "error": error, "checksum": None}
+            for xml_path, loaded, checksum, error in parsed]
+
+def _init_worker(log_queue, log_level):
+    # Spawned workers start with the default stdout handler; send their records to the
+    # parent instead, which writes them with whatever handlers it has configured
+    configure_worker_logging(log_queue, log_level)
+
+def _process_job(job):
+    kind, paths, schema_dir, config_file = job
+    if kind == "json":
+        return process_json_batch(paths, schema_dir, config_file)
+    return process_xml_batch(paths, schema_dir, config_file)
+
+def _batches(kind, paths, schema_dir, config, size):
+    return [(kind, paths[start:start + size], schema_dir, config) for start in range(0, len(paths), size)]
+
+def schema_generator(JSON_DIR, JSON_SCHEMA_DIR, XML_DIR, XSD_DIR, CONFIG_FILE, workers=None):
+    """
+    Generate and validate schemas for every JSON and XML file in the given directories.
+
+    Files are processed in batches; the stored schemas of each batch are fetched with one
+    SchemaCache.load_many call before the files are validated.
+
+    Parameters:
+    - workers (int): Number of worker processes. None or 1 processes files in this process.
+
+    Returns:
+    - list[dict]: One status record per file, JSON files first, each group sorted by filename.
+    """
+    # Load and index the config once for the whole run
+    config = resolve_config(CONFIG_FILE)
+
+    json_paths = [f"{JSON_DIR}/{filename}" for filename in list_files(JSON_DIR, '.json')]
+    xml_paths = [f"{XML_DIR}/{filename}" for filename in list_files(XML_DIR, '.xml')]
+
+    if not workers or workers <= 1:
+        batch_size = LOOKUP_BATCH
+    else:
+        # Small enough that every worker gets several batches
+        batch_size = max(1, min(LOOKUP_BATCH, (len(json_paths) + len(xml_paths)) // (workers * 4)))
+    jobs = (_batches("json", json_paths, JSON_SCHEMA_DIR, config, batch_size)
+            + _batches("xml", xml_paths, XSD_DIR, config, batch_size))
+
+    if not workers or workers <= 1:
+        return [status for job in jobs for status in _process_job(job)]
+
+    # executor.map yields results in submission order, so the output is deterministic
+    log_queue = multiprocessing.Queue()
+    listener = listen_for_logs(log_queue)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(log_queue, logging.getLogger(ROOT_LOGGER_NAME).level)) as executor:
+            return [status for batch in executor.map(_process_job, jobs) for status in batch]
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
 
@@ -36,5 +181,5 @@ if __name__ == "__main__":
     XML_DIR = "files/xml"
     XSD_DIR = "files/xsd"
     CONFIG_FILE = "config.json"
-    
-    schema_generator(JSON_DIR, JSON_SCHEMA_DIR, XML_DIR, XSD_DIR, CONFIG_FILE)
\ No newline at end of file
+
+    schema_generator(JSON_DIR, JSON_SCHEMA_DIR, XML_DIR, XSD_DIR, CONFIG_FILE)
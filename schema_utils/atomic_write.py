@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+def atomic_write(path, data, encoding="utf-8"):
+    """
+    Writes data to a file so that readers only ever see the old file or the complete new one.
+
+    The content goes to a temporary file in the same directory, which is then renamed over
+    the target. Concurrent writers of the same checksum simply replace each other's
+    (identical) output instead of interleaving partial writes.
+
+    Parameters:
+    - path (str): Destination file path.
+    - data (str | bytes): Content to write; strings are encoded with `encoding`.
+    """
+    if isinstance(data, str):
+        data = data.encode(encoding)
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
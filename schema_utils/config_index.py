@@ -0,0 +1,161 @@
+import fnmatch
+import json
+import os
+import re
+import threading
+from .events import WARNING, get_logger, log_event
+
+_log = get_logger(__name__)
+
+GLOB_CHARS = frozenset("*?[")
+# Numbered group references change meaning once a regex is embedded in the combined matcher
+NUMBERED_GROUP_REF = re.compile(r"\\(?:[1-9]|g<\d+>)|\(\?\(\d")
+RESOLUTION_CACHE_LIMIT = 100_000
+
+class CompiledConfig:
+    """
+    config.json entries indexed by filename for O(1) per-file lookups.
+
+    An entry applies to a file through one of:
+    - "file": an exact filename, or a glob such as "streem*.xml" if it contains * ? or [
+    - "file_regex": a regular expression that must match the whole filename
+
+    Exact filenames take precedence over patterns; among exact entries, and among
+    pattern entries, the first one in the config wins. Patterns are compiled into a
+    single regular expression and each filename's resolution is cached, so lookups stay
+    fast with many patterns. Regexes that cannot be embedded in the combined expression
+    (global flags such as "(?i)", numbered backreferences, group names used twice or
+    starting with "_p") still work: the patterns are then tried one by one. Invalid
+    patterns are skipped with a warning.
+
+    Parameters:
+    - entries (list[dict]): The parsed config.json entries.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._by_file = {}
+        self._resolved = {}
+        pattern_entries = []
+        patterns = []
+        matchers = []
+        combinable = True
+        for entry in entries:
+            filename = entry.get("file")
+            regex = entry.get("file_regex")
+            if regex is None and filename is not None and GLOB_CHARS.isdisjoint(filename):
+                if filename not in self._by_file:
+                    self._by_file[filename] = self._index(entry)
+                continue
+
+            pattern = regex if regex is not None else fnmatch.translate(filename) if filename else None
+            if pattern is None:
+                continue
+            try:
+                matchers.append(re.compile(pattern).fullmatch)
+            except re.error as e:
+                log_event(_log, WARNING, "config.invalid_pattern", "⚠️ Warning: Ignoring invalid file pattern %r: %s",
+                          pattern, e, pattern=pattern)
+                continue
+            if NUMBERED_GROUP_REF.search(pattern):
+                combinable = False
+            patterns.append(f"(?P<_p{len(pattern_entries)}>{pattern})")
+            pattern_entries.append(self._index(entry))
+
+        self._pattern_entries = pattern_entries
+        self._pattern_matchers = matchers
+        self._matcher = None
+        if patterns and combinable:
+            try:
+                self._matcher = re.compile("|".join(patterns)).fullmatch
+            except re.error:
+                # Valid on their own but not side by side; _resolve tries them one by one
+                pass
+
+    @staticmethod
+    def _index(entry):
+        return (
+            entry,
+            frozenset(entry.get("optional_fields", [])),
+            frozenset(entry.get("allow_null_fields", [])),
+        )
+
+    def _resolve(self, filename):
+        indexed = self._by_file.get(filename)
+        if indexed is not None or not self._pattern_entries:
+            return indexed
+
+        try:
+            return self._resolved[filename]
+        except KeyError:
+            pass
+
+        if self._matcher is not None:
+            match = self._matcher(filename)
+            # The outer named group closes last, so lastgroup names the pattern that matched
+            indexed = self._pattern_entries[int(match.lastgroup[2:])] if match else None
+        else:
+            pairs = zip(self._pattern_matchers, self._pattern_entries)
+            indexed = next((pattern_entry for matcher, pattern_entry in pairs if matcher(filename)), None)
+        if len(self._resolved) >= RESOLUTION_CACHE_LIMIT:
+            self._resolved.clear()
+        self._resolved[filename] = indexed
+        return indexed
+
+    def get_file_config(self, filename):
+        """Return the config entry for filename, or an empty dict."""
+        indexed = self._resolve(filename)
+        return indexed[0] if indexed else {}
+
+    def get_fields(self, filename):
+        """Return (optional_fields, allow_null_fields) for filename as frozensets."""
+        indexed = self._resolve(filename)
+        if indexed is None:
+            return frozenset(), frozenset()
+        return indexed[1], indexed[2]
+
+EMPTY_CONFIG = CompiledConfig([])
+
+# config path -> (mtime_ns, size, CompiledConfig)
+_loaded_configs = {}
+_lock = threading.Lock()
+
+def load_compiled_config(config_path):
+    """
+    Return the compiled config for config_path, loading it once per process and again
+    only when the file's modification time or size changes.
+
+    Parameters:
+    - config_path (str): Path to config.json. A missing file yields an empty config.
+    """
+    key = os.path.abspath(config_path)
+    try:
+        stat = os.stat(key)
+    except FileNotFoundError:
+        return EMPTY_CONFIG
+
+    version = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded_configs.get(key)
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    with _lock:
+        try:
+            with open(key, "r", encoding="utf-8") as f:
+                compiled = CompiledConfig(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            log_event(_log, WARNING, "config.load_failed", "⚠️ Warning: Could not load config file %s: %s",
+                      config_path, e, config_file=config_path)
+            compiled = EMPTY_CONFIG
+        _loaded_configs[key] = (version, compiled)
+    return compiled
+
+def resolve_config(config):
+    """
+    Accept a config path, an already compiled config, or None and return a CompiledConfig.
+    """
+    if not config:
+        return EMPTY_CONFIG
+    if isinstance(config, CompiledConfig):
+        return config
+    return load_compiled_config(config)
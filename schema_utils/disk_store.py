@@ -0,0 +1,113 @@
+import os
+import threading
+from .atomic_write import atomic_write
+from .locking import FileLock
+from .schema_store import SchemaStore
+
+LAYOUT_FILE = ".layout"
+FLAT = "flat"
+SHARDED = "sharded"
+LAYOUTS = (FLAT, SHARDED)
+
+# directory abspath -> layout, read from its LAYOUT_FILE once per process
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+def read_layout(directory):
+    """Return the layout recorded in directory's .layout file; flat if there is none."""
+    try:
+        with open(os.path.join(directory, LAYOUT_FILE), "r", encoding="utf-8") as f:
+            layout = f.read().strip()
+    except OSError:
+        return FLAT
+    return layout if layout in LAYOUTS else FLAT
+
+def get_layout(directory, refresh=False):
+    """Return directory's layout, cached per process unless refresh is set."""
+    key = os.path.abspath(directory)
+    layout = None if refresh else _layouts.get(key)
+    if layout is None:
+        layout = read_layout(directory)
+        with _layouts_lock:
+            _layouts[key] = layout
+    return layout
+
+def write_layout(directory, layout):
+    """Record directory's layout in its .layout file."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {LAYOUTS}")
+    atomic_write(os.path.join(directory, LAYOUT_FILE), f"{layout}\n")
+    with _layouts_lock:
+        _layouts[os.path.abspath(directory)] = layout
+
+def layout_path(directory, checksum, extension, layout):
+    """Path of checksum's file in directory under the given layout."""
+    filename = f"{checksum}{extension}"
+    if layout == SHARDED:
+        return os.path.join(directory, checksum[:2], checksum[2:4], filename)
+    return os.path.join(directory, filename)
+
+class DiskStore(SchemaStore):
+    """
+    Checksum-named schema files in one directory, e.g. files/json_schema/<checksum>.json.
+
+    The directory is either flat or sharded into two levels of subdirectories named after
+    the first four hex digits (ab/cd/abcd....json), which keeps every directory small as
+    the store grows to hundreds of thousands of schemas. The layout is recorded in the
+    directory's .layout file (flat when absent) and changed with
+    `python -m schema_utils.migrate_layout`. A miss also tries the other layout, so
+    readers keep hitting while a migration is in progress.
+
+    Parameters:
+    - directory (str): Directory holding the schema files.
+    - extension (str): File extension including the dot, e.g. ".json" or ".xsd".
+    - layout (str): "flat" or "sharded"; read from the directory's .layout file if None.
+    """
+
+    def __init__(self, directory, extension, layout=None):
+        self.directory = directory
+        self.extension = extension
+        self.layout = layout or get_layout(directory)
+
+    @property
+    def key(self):
+        """Identifies this store in shared caches."""
+        return (os.path.abspath(self.directory), self.extension)
+
+    def path_for(self, checksum):
+        return layout_path(self.directory, checksum, self.extension, self.layout)
+
+    def read(self, checksum):
+        """Return the stored bytes for checksum, or None if there are none."""
+        try:
+            with open(self.path_for(checksum), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+
+        # The directory may be (or have been) migrated to the other layout
+        other = FLAT if self.layout == SHARDED else SHARDED
+        try:
+            with open(layout_path(self.directory, checksum, self.extension, other), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self.layout = get_layout(self.directory, refresh=True)
+        return data
+
+    def exists(self, checksum):
+        return os.path.exists(self.path_for(checksum))
+
+    def write(self, checksum, data):
+        path = self.path_for(checksum)
+        if self.layout == SHARDED:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, data)
+
+    def lock(self, checksum, **kwargs):
+        """
+        Return a cross-process FileLock guarding the generation of checksum. Waiters stop
+        waiting as soon as the schema file exists.
+        """
+        kwargs.setdefault("ready", lambda: self.exists(checksum))
+        return FileLock(os.path.join(self.directory, f".{checksum}{self.extension}.lock"), **kwargs)
@@ -0,0 +1,104 @@
+import json
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER_NAME = "schema_generator"
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+class StructuredFormatter(logging.Formatter):
+    """Formats each record as one JSON object with its event name and fields."""
+
+    def format(self, record):
+        event = {
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+        }
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time, as print() does."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+def get_logger(name):
+    """Return the logger for a module, nested under the shared schema_generator logger."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def log_event(logger, level, event, message, *args, **fields):
+    """
+    Log a named event with structured fields. Nothing is formatted unless the level is
+    enabled; per-node hot paths should still guard with logger.isEnabledFor(level) so
+    that not even the arguments are built.
+
+    Parameters:
+    - logger (logging.Logger): Logger from get_logger().
+    - level (int): Logging level, e.g. INFO.
+    - event (str): Stable event name, e.g. "schema.hit".
+    - message (str): %-style message rendered for humans.
+    - fields: Structured values attached to the record.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={"event": event, "fields": fields})
+
+def configure_logging(level=INFO, structured=False, quiet=False, stream=None, handler=None):
+    """
+    Configure output for both packages.
+
+    Parameters:
+    - level (int): Minimum level to emit. INFO matches the classic per-file console output.
+    - structured (bool): Emit one JSON object per event instead of the plain message.
+    - quiet (bool): High-throughput mode; only errors are emitted and every per-file and
+      per-node log call is skipped by its level check.
+    - stream: Stream for the default handler, stdout if None.
+    - handler (logging.Handler): Use this handler instead of a stream handler.
+    """
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+
+    if handler is None:
+        handler = logging.StreamHandler(stream) if stream else StdoutHandler()
+        handler.setFormatter(StructuredFormatter() if structured else logging.Formatter("%(message)s"))
+    root.addHandler(handler)
+    root.setLevel(ERROR if quiet else level)
+    root.propagate = False
+
+def configure_worker_logging(queue, level):
+    """
+    Send this process's records to queue instead of writing them, for worker processes
+    whose parent writes them with its own handlers through listen_for_logs(queue).
+
+    Parameters:
+    - queue (multiprocessing.Queue): Queue shared with the parent.
+    - level (int): Minimum level to send; pass the parent's, so disabled calls stay skipped.
+    """
+    configure_logging(level=level, handler=QueueHandler(queue))
+
+def listen_for_logs(queue):
+    """
+    Start passing the records that workers put on queue to the handlers configured in this
+    process, so they are formatted and written like its own. Call stop() on the returned
+    listener once the workers have exited; it writes any records still queued.
+    """
+    listener = QueueListener(queue, *logging.getLogger(ROOT_LOGGER_NAME).handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+configure_logging()
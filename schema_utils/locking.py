@@ -0,0 +1,119 @@
+import os
+import socket
+import time
+from .events import WARNING, get_logger, log_event
+
+_log = get_logger(__name__)
+
+LOCK_TIMEOUT = 60.0
+LOCK_STALE_AFTER = 300.0
+POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.25
+
+class FileLock:
+    """
+    Cross-process lock held by creating a lock file with O_CREAT | O_EXCL.
+
+    Exclusive creation is atomic on local filesystems and NFSv3+, so processes on
+    different hosts sharing one cache directory agree on a single holder. Waiters poll
+    with exponential backoff. A lock file older than stale_after seconds is assumed to
+    belong to a crashed holder and is broken; a waiter that times out proceeds without
+    the lock, since writes are atomic and the worst case is duplicated work.
+
+    Breaking a stale lock is not fully atomic. A waiter that moves a fresh lock aside
+    by mistake detects it and puts the lock back. But if a third process creates a lock
+    in that short window, two processes hold the lock and generate the same schema.
+    Like a timeout, this only duplicates work.
+
+    Parameters:
+    - path (str): Lock file path.
+    - timeout (float): Seconds to wait for the lock before giving up.
+    - stale_after (float): Age in seconds after which a lock file is considered abandoned.
+      Must exceed the longest expected time the lock is held.
+    - ready (callable): Optional check polled while waiting; once it returns True the
+      holder's work is available and the waiter stops without taking the lock.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT, stale_after=LOCK_STALE_AFTER, ready=None):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.ready = ready
+        self.acquired = False
+
+    def acquire(self):
+        """
+        Wait for the lock; returns True once held, False if it timed out, cannot be created
+        or ready() reported the result available.
+        """
+        deadline = time.monotonic() + self.timeout
+        interval = POLL_INTERVAL
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self.ready is not None and self.ready():
+                    return False
+                self._break_if_stale()
+            except OSError:
+                # Missing or read-only directory: nothing to coordinate, the write reports it
+                return False
+            else:
+                with os.fdopen(fd, "w") as f:
+                    f.write(f"{socket.gethostname()} {os.getpid()} {time.time():.3f}\n")
+                self.acquired = True
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log_event(_log, WARNING, "lock.timeout", "⚠️ Warning: Timed out waiting for lock %s", self.path,
+                          lock=self.path, timeout=self.timeout)
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    def _break_if_stale(self):
+        try:
+            stale = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        age = time.time() - stale.st_mtime
+        if age < self.stale_after:
+            return
+        # Move the lock aside under a name of our own, then check that we moved the file we
+        # judged stale. Two waiters can both see the stale lock: if the other one broke it
+        # first and a new holder has created a fresh lock since our stat, we just moved
+        # the fresh lock and must put it back.
+        broken = f"{self.path}.{socket.gethostname()}.{os.getpid()}.stale"
+        try:
+            os.rename(self.path, broken)
+            moved = os.stat(broken)
+        except FileNotFoundError:
+            return
+        if (moved.st_dev, moved.st_ino, moved.st_mtime_ns) != (stale.st_dev, stale.st_ino, stale.st_mtime_ns):
+            try:
+                # link fails instead of overwriting if yet another process took the lock meanwhile
+                os.link(broken, self.path)
+            except OSError:
+                log_event(_log, WARNING, "lock.stale_race", "⚠️ Warning: Lock %s was taken while breaking it",
+                          self.path, lock=self.path)
+            os.remove(broken)
+            return
+        os.remove(broken)
+        log_event(_log, WARNING, "lock.stale", "⚠️ Warning: Broke stale lock %s (%.0fs old)", self.path, age,
+                  lock=self.path, age=age)
+
+    def release(self):
+        if self.acquired:
+            self.acquired = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    A thread-safe, bounded least-recently-used cache with hit/miss counters.
+
+    Parameters:
+    - maxsize (int): Maximum number of entries kept before the oldest is evicted.
+    - max_bytes (int): Optional limit on the summed size of all entries, as passed to put().
+    - ttl (float): Optional number of seconds after which an entry expires.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=None, ttl=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.total_bytes = 0
+        # key -> (value, size, expires_at)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=1):
+        """Store value under key; size counts towards max_bytes."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self.total_bytes += size
+            self._evict()
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, building and storing it with factory() on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def resize(self, maxsize, max_bytes=None):
+        with self._lock:
+            self.maxsize = maxsize
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _expired(self, entry):
+        return entry[2] is not None and time.monotonic() >= entry[2]
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self):
+        while self._data and (len(self._data) > self.maxsize or
+                              (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
@@ -0,0 +1,97 @@
+import os
+import sys
+from .disk_store import FLAT, LAYOUTS, SHARDED, get_layout, layout_path, write_layout
+
+# === Store Layout Migration ===
+#
+# Moves the checksum-named files of a schema directory between the flat layout
+# (<checksum>.json) and the sharded one (ab/cd/<checksum>.json), in place. The .layout
+# marker is written first, and DiskStore falls back to the other layout on a miss, so
+# running generators keep finding every schema while files are being moved. Files are
+# moved with os.replace, which is atomic within one filesystem. Only checksum-named files
+# are moved; anything else in the directory is left where it is.
+
+HEX_DIGITS = frozenset("0123456789abcdef")
+CHECKSUM_LENGTH = 64
+
+def _is_shard(name):
+    return len(name) == 2 and all(c in HEX_DIGITS for c in name)
+
+def _is_checksum(name):
+    return len(name) == CHECKSUM_LENGTH and all(c in HEX_DIGITS for c in name)
+
+def _sharded_files(directory, extension):
+    for first in sorted(os.listdir(directory)):
+        first_dir = os.path.join(directory, first)
+        if not _is_shard(first) or not os.path.isdir(first_dir):
+            continue
+        for second in sorted(os.listdir(first_dir)):
+            second_dir = os.path.join(first_dir, second)
+            if not _is_shard(second) or not os.path.isdir(second_dir):
+                continue
+            for filename in sorted(os.listdir(second_dir)):
+                checksum = filename[:-len(extension)]
+                if filename.endswith(extension) and _is_checksum(checksum):
+                    yield os.path.join(second_dir, filename), checksum
+
+def migrate_layout(directory, extension, layout=SHARDED):
+    """
+    Converts a schema directory to the given layout.
+
+    Parameters:
+    - directory (str): Schema directory, e.g. files/json_schema.
+    - extension (str): Schema file extension including the dot, e.g. ".json".
+    - layout (str): Target layout, "sharded" or "flat".
+
+    Returns:
+    - int: Number of schema files moved.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {LAYOUTS}")
+    if not extension.startswith("."):
+        extension = f".{extension}"
+
+    write_layout(directory, layout)
+    moved = 0
+
+    if layout == SHARDED:
+        with os.scandir(directory) as entries:
+            sources = sorted(entry.name for entry in entries
+                             if entry.is_file() and entry.name.endswith(extension)
+                             and _is_checksum(entry.name[:-len(extension)]))
+        for filename in sources:
+            target = layout_path(directory, filename[:-len(extension)], extension, SHARDED)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(os.path.join(directory, filename), target)
+            moved += 1
+    else:
+        for source, checksum in list(_sharded_files(directory, extension)):
+            os.replace(source, layout_path(directory, checksum, extension, FLAT))
+            moved += 1
+        # Drop shard directories left empty
+        for first in os.listdir(directory):
+            first_dir = os.path.join(directory, first)
+            if not _is_shard(first) or not os.path.isdir(first_dir):
+                continue
+            for second in os.listdir(first_dir):
+                try:
+                    os.rmdir(os.path.join(first_dir, second))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(first_dir)
+            except OSError:
+                pass
+
+    get_layout(directory, refresh=True)
+    return moved
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or (len(sys.argv) > 3 and sys.argv[3] not in LAYOUTS):
+        print("Usage: python -m schema_utils.migrate_layout <schema_dir> <extension> [sharded|flat]")
+        sys.exit(1)
+
+    directory, extension = sys.argv[1], sys.argv[2]
+    target = sys.argv[3] if len(sys.argv) > 3 else SHARDED
+    count = migrate_layout(directory, extension, target)
+    print(f"✅ Moved {count} schema(s) in {directory} to the {target} layout.")
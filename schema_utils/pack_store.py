@@ -0,0 +1,220 @@
+import contextlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from .schema_store import SchemaStore, open_store
+
+# === Packed Schema Archive ===
+#
+# One immutable file holding every JSON schema and XSD of a deployment:
+#
+#   header  "SCHPACK1" | version u32 | entry count u32 | data offset u64
+#   index   entry count x (kind u8 | sha256 digest 32s | offset u64 | length u64),
+#           sorted by kind and digest
+#   data    the schema files, stored as is
+#
+# PackStore maps the file read-only and binary-searches the index in place, so a hit
+# costs no system call, and all worker processes share the file's pages in the page cache
+# instead of each holding its own copy of the schemas.
+
+MAGIC = b"SCHPACK1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+ENTRY = struct.Struct("<B32sQQ")
+KEY_SIZE = 33
+KINDS = {".json": 0, ".xsd": 1}
+CHECKSUM_LENGTH = 64
+
+def _checksum_files(directory, extension):
+    """Yield (checksum, path) for the schema files of a flat or sharded directory."""
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            checksum = filename[:-len(extension)]
+            if filename.endswith(extension) and len(checksum) == CHECKSUM_LENGTH:
+                try:
+                    bytes.fromhex(checksum)
+                except ValueError:
+                    continue
+                yield checksum, os.path.join(dirpath, filename)
+
+def build_pack(pack_path, json_schema_dir=None, xsd_dir=None):
+    """
+    Packs the schema directories into one archive, replacing pack_path atomically.
+    Processes that have the previous archive mapped keep reading it until they reopen.
+
+    Parameters:
+    - pack_path (str): Archive to write, e.g. files/schemas.pack.
+    - json_schema_dir (str): Directory of <checksum>.json schemas, flat or sharded.
+    - xsd_dir (str): Directory of <checksum>.xsd schemas, flat or sharded.
+
+    Returns:
+    - int: Number of schemas packed.
+    """
+    sources = []
+    for directory, extension in ((json_schema_dir, ".json"), (xsd_dir, ".xsd")):
+        if directory:
+            for checksum, path in _checksum_files(directory, extension):
+                sources.append((bytes((KINDS[extension],)) + bytes.fromhex(checksum), path))
+    sources.sort()
+
+    data_offset = HEADER.size + ENTRY.size * len(sources)
+    directory = os.path.dirname(os.path.abspath(pack_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w+b") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(sources), data_offset))
+            f.seek(data_offset)
+            index = []
+            offset = data_offset
+            for key, path in sources:
+                with open(path, "rb") as source:
+                    data = source.read()
+                f.write(data)
+                index.append(ENTRY.pack(key[0], key[1:], offset, len(data)))
+                offset += len(data)
+            f.seek(HEADER.size)
+            f.write(b"".join(index))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, pack_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(sources)
+
+class PackStore(SchemaStore):
+    """
+    Read-only schema store backed by a memory-mapped pack built with build_pack.
+
+    Parameters:
+    - path (str): The pack file.
+    - extension (str): ".json" or ".xsd", selecting which schemas this store serves.
+    - fallback (str | SchemaStore): Optional writable store for checksums missing from the
+      pack; new schemas are written there. Without one, writes raise PermissionError.
+    """
+
+    def __init__(self, path, extension, fallback=None):
+        if extension not in KINDS:
+            raise ValueError(f"Unknown schema extension {extension!r}, expected one of {tuple(KINDS)}")
+        self.path = path
+        self.extension = extension
+        self.kind = KINDS[extension]
+        self.fallback = fallback
+        self._fallback = open_store(fallback, extension) if fallback is not None else None
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a schema pack")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self._data_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} schema pack")
+        # A truncated pack keeps the sorted prefix of its index; the rest count as missing
+        self._count = min(count, (len(self._mm) - HEADER.size) // ENTRY.size)
+
+    def __getstate__(self):
+        # The mapping cannot be pickled; worker processes map the file themselves
+        return {"path": self.path, "extension": self.extension, "fallback": self.fallback}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def checksums(self):
+        """Yield the checksums of the schemas of this store's kind held in the pack."""
+        mm = self._mm
+        for i in range(self._count):
+            kind, digest, _, _ = ENTRY.unpack_from(mm, HEADER.size + i * ENTRY.size)
+            if kind == self.kind:
+                yield digest.hex()
+
+    @property
+    def key(self):
+        return ("pack", os.path.abspath(self.path), self.extension)
+
+    def path_for(self, checksum):
+        return f"{self.path}#{checksum}{self.extension}"
+
+    def _find(self, checksum):
+        """
+        Return (offset, length) of checksum's schema in the pack, or None. Raises
+        ValueError if its entry points outside the data, e.g. in a truncated pack.
+        """
+        try:
+            key = bytes((self.kind,)) + bytes.fromhex(checksum)
+        except ValueError:
+            return None
+        if len(key) != KEY_SIZE:
+            return None
+
+        mm = self._mm
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position = HEADER.size + mid * ENTRY.size
+            entry_key = mm[position:position + KEY_SIZE]
+            if entry_key < key:
+                lo = mid + 1
+            elif entry_key > key:
+                hi = mid
+            else:
+                _, _, offset, length = ENTRY.unpack_from(mm, position)
+                if offset < self._data_offset or offset + length > len(mm):
+                    raise ValueError(f"Corrupt schema pack {self.path}: {checksum} lies outside the file")
+                return offset, length
+        return None
+
+    def read(self, checksum):
+        """
+        Return the stored bytes for checksum from the pack, else from the fallback.
+        A corrupt entry is read from the fallback, or raises ValueError without one.
+        """
+        try:
+            found = self._find(checksum)
+        except ValueError:
+            if self._fallback is None:
+                raise
+            found = None
+        if found is not None:
+            offset, length = found
+            return self._mm[offset:offset + length]
+        return self._fallback.read(checksum) if self._fallback is not None else None
+
+    def exists(self, checksum):
+        try:
+            if self._find(checksum) is not None:
+                return True
+        except ValueError:
+            pass
+        return self._fallback is not None and self._fallback.exists(checksum)
+
+    def write(self, checksum, data):
+        if self._fallback is None:
+            raise PermissionError(f"Schema pack {self.path} is read-only")
+        self._fallback.write(checksum, data)
+
+    def lock(self, checksum, **kwargs):
+        if self._fallback is None:
+            return contextlib.nullcontext()
+        return self._fallback.lock(checksum, **kwargs)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "info"):
+        print("Usage: python -m schema_utils.pack_store build <pack_file> <json_schema_dir> <xsd_dir>")
+        print("       python -m schema_utils.pack_store info <pack_file>")
+        sys.exit(1)
+
+    if sys.argv[1] == "build":
+        count = build_pack(sys.argv[2], *sys.argv[3:5])
+        print(f"✅ Packed {count} schema(s) into {sys.argv[2]}.")
+    else:
+        for extension in KINDS:
+            count = sum(1 for _ in PackStore(sys.argv[2], extension).checksums())
+            print(f"{extension}: {count} schema(s)")
+        print(f"{os.path.getsize(sys.argv[2])} bytes")
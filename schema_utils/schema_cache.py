@@ -0,0 +1,96 @@
+from .lru_cache import LRUCache
+
+class SchemaCache:
+    """
+    Two-tier schema cache: an in-process LRU of decoded schemas in front of a schema store.
+
+    The memory tier is shared by every store passed in, so the JSON and XML generators
+    compete for the same entry and byte budget. Values returned from the memory tier
+    are shared objects and must not be mutated by callers.
+
+    Parameters:
+    - max_entries (int): Maximum number of schemas kept in memory.
+    - max_bytes (int): Optional limit on the summed stored size of schemas kept in memory.
+    - ttl (float): Optional number of seconds before a memory entry is re-read from the store.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None):
+        self.memory = LRUCache(maxsize=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self.store_hits = 0
+        self.store_misses = 0
+
+    def load(self, store, checksum, decode=None):
+        """
+        Return the schema for checksum, or None if neither tier has it.
+
+        Parameters:
+        - store (SchemaStore): Backing store, e.g. a DiskStore or SQLiteStore.
+        - checksum (str): Schema checksum.
+        - decode (callable): Converts the stored bytes into the cached value; raw bytes if None.
+        """
+        key = (store.key, checksum)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        data = store.read(checksum)
+        if data is None:
+            self.store_misses += 1
+            return None
+        self.store_hits += 1
+
+        value = decode(data) if decode else data
+        self.memory.put(key, value, size=len(data))
+        return value
+
+    def load_many(self, store, checksums, decode=None):
+        """
+        Return {checksum: schema} for those of checksums found in either tier. Checksums
+        missing from memory are fetched with a single store.read_many call, which a
+        SQLiteStore answers with one query instead of one file open per checksum.
+        """
+        found = {}
+        missing = []
+        for checksum in checksums:
+            value = self.memory.get((store.key, checksum))
+            if value is not None:
+                found[checksum] = value
+            else:
+                missing.append(checksum)
+        if not missing:
+            return found
+
+        fetched = store.read_many(missing)
+        self.store_hits += len(fetched)
+        self.store_misses += len(set(missing)) - len(fetched)
+        for checksum, data in fetched.items():
+            value = decode(data) if decode else data
+            self.memory.put((store.key, checksum), value, size=len(data))
+            found[checksum] = value
+        return found
+
+    def save(self, store, checksum, data, value=None):
+        """Write data to the store and keep value (or the raw data) in memory."""
+        store.write(checksum, data)
+        self.memory.put((store.key, checksum), data if value is None else value, size=len(data))
+
+    def clear(self):
+        self.memory.clear()
+        self.store_hits = self.store_misses = 0
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats["store_hits"] = self.store_hits
+        stats["store_misses"] = self.store_misses
+        return stats
+
+_schema_cache = SchemaCache()
+
+def get_schema_cache():
+    """Return the process-wide schema cache used by the JSON and XML generators."""
+    return _schema_cache
+
+def set_schema_cache(cache):
+    """Replace the process-wide schema cache, e.g. with SchemaCache(max_bytes=..., ttl=...)."""
+    global _schema_cache
+    _schema_cache = cache
@@ -0,0 +1,91 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+PACK_EXTENSION = ".pack"
+
+class SchemaStore(ABC):
+    """
+    Backend holding schemas by checksum, behind the in-memory SchemaCache.
+
+    Subclasses implement key, path_for, read, write and lock, and cannot be instantiated
+    without them; read_many and exists have generic fallbacks. Stored data is the
+    schema file content as bytes (JSON Schema or XSD).
+    """
+
+    @property
+    @abstractmethod
+    def key(self):
+        """Identifies this store in shared caches; must be hashable and stable across instances."""
+
+    @abstractmethod
+    def path_for(self, checksum):
+        """Human-readable location of checksum, used in log messages."""
+
+    @abstractmethod
+    def read(self, checksum):
+        """
+        Return the stored bytes for checksum, or None if there are none. An entry that
+        cannot be read raises OSError or ValueError, which callers count as a miss.
+        """
+
+    def read_many(self, checksums):
+        """Return {checksum: bytes} for those of checksums that are stored."""
+        found = {}
+        for checksum in checksums:
+            data = self.read(checksum)
+            if data is not None:
+                found[checksum] = data
+        return found
+
+    def exists(self, checksum):
+        return self.read(checksum) is not None
+
+    @abstractmethod
+    def write(self, checksum, data):
+        """Store data (bytes) for checksum, replacing any previous entry atomically."""
+
+    @abstractmethod
+    def lock(self, checksum, **kwargs):
+        """Return a context manager held while checksum's schema is generated."""
+
+# (abspath, extension) -> SQLiteStore or PackStore, so connections and mappings are reused
+_opened_stores = {}
+_opened_stores_lock = threading.Lock()
+
+def open_store(location, extension):
+    """
+    Return the schema store for location.
+
+    Parameters:
+    - location (str | SchemaStore): A store instance, returned as is; a path ending in
+      .sqlite, .sqlite3 or .db, opened as a SQLiteStore; a path ending in .pack, opened
+      as a read-only PackStore; or a schema directory, opened as a DiskStore.
+    - extension (str): Schema file extension including the dot, e.g. ".json" or ".xsd";
+      SQLite stores use it to keep JSON schemas and XSDs apart in one database.
+    """
+    if isinstance(location, SchemaStore):
+        return location
+
+    # Imported here because the backends subclass SchemaStore
+    from .disk_store import DiskStore
+    from .pack_store import PackStore
+    from .sqlite_store import SQLiteStore
+
+    location = str(location)
+    if location.endswith(SQLITE_EXTENSIONS):
+        backend = SQLiteStore
+    elif location.endswith(PACK_EXTENSION):
+        backend = PackStore
+    else:
+        return DiskStore(location, extension)
+
+    key = (os.path.abspath(location), extension)
+    store = _opened_stores.get(key)
+    if store is None:
+        with _opened_stores_lock:
+            store = _opened_stores.get(key)
+            if store is None:
+                store = _opened_stores[key] = backend(location, extension)
+    return store
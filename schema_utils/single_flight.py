@@ -0,0 +1,62 @@
+import threading
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution within a process.
+
+    The first caller for a key runs the function; callers arriving while it runs wait
+    and receive its result, or its exception, instead of repeating the work. Once the
+    call finishes the key is forgotten, so later calls run again (normally hitting the
+    schema cache by then). Combine with FileLock for coordination across processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Run fn() unless a call for key is already in flight, and return its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._calls)}
+
+# Shared by the JSON and XML generators, keyed by (store key, checksum)
+schema_generation = SingleFlight()
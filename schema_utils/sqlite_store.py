@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from multiprocessing import util as multiprocessing_util
+from .locking import FileLock
+from .schema_store import SchemaStore
+
+# SQLite's default limit on host parameters is 999 in older versions
+READ_MANY_BATCH = 500
+# Recorded hits are written after this many reads or seconds, whichever comes first
+HIT_FLUSH_EVERY = 256
+HIT_FLUSH_SECONDS = 5.0
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS schemas (
+    kind       TEXT    NOT NULL,
+    checksum   TEXT    NOT NULL,
+    data       BLOB    NOT NULL,
+    created_at REAL    NOT NULL,
+    last_hit   REAL,
+    hit_count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, checksum)
+)
+"""
+
+class SQLiteStore(SchemaStore):
+    """
+    Schemas stored as zlib-compressed blobs in one SQLite database in WAL mode.
+
+    Rows are keyed by (kind, checksum), where kind is the schema extension (".json" or
+    ".xsd"), so JSON schemas and XSDs can share one database. Each row records when
+    it was created, when it was last read and how often. Hits are counted in memory
+    and written in batches. A flush triggered by a read gives up at once if another
+    connection holds the write lock and keeps the counts for the next flush, so reads
+    never wait on the database write lock. Because
+    repeated checksums are normally served by the in-memory SchemaCache, only reads
+    that reach the store are counted. Each thread and process opens its own
+    connection, so one instance can be shared by threads and inherited by forked
+    workers.
+
+    Parameters:
+    - path (str): Database file, created if missing.
+    - extension (str): Schema extension stored as the row kind, e.g. ".json" or ".xsd".
+    - timeout (float): Seconds to wait for another connection's write lock.
+    """
+
+    def __init__(self, path, extension, timeout=30.0):
+        self.path = path
+        self.extension = extension
+        self.timeout = timeout
+        self._local = threading.local()
+        self._hits_lock = threading.Lock()
+        self._pending_hits = {}
+        self._pending_count = 0
+        self._pending_pid = os.getpid()
+        self._flushed_at = time.monotonic()
+        # Runs at interpreter exit, and also when multiprocessing workers exit (they skip atexit)
+        multiprocessing_util.Finalize(None, self.flush_hits, exitpriority=10)
+
+    def __getstate__(self):
+        # Connections and locks cannot be pickled; worker processes open their own
+        return {"path": self.path, "extension": self.extension, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def key(self):
+        return ("sqlite", os.path.abspath(self.path), self.extension)
+
+    def path_for(self, checksum):
+        return f"{self.path}#{checksum}{self.extension}"
+
+    def _connection(self):
+        local = self._local
+        connection = getattr(local, "connection", None)
+        if connection is None or local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA_SQL)
+            local.connection = connection
+            local.pid = os.getpid()
+        return connection
+
+    def _transaction(self, statements, wait=True):
+        """
+        Run (sql, parameters) pairs in one write transaction; executemany for lists of
+        parameters. With wait=False, raise sqlite3.OperationalError at once instead of
+        waiting up to timeout seconds if another connection holds the write lock.
+        """
+        connection = self._connection()
+        if wait:
+            connection.execute("BEGIN IMMEDIATE")
+        else:
+            connection.execute("PRAGMA busy_timeout = 0")
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+            finally:
+                connection.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        try:
+            results = []
+            for sql, parameters in statements:
+                run = connection.executemany if isinstance(parameters, list) else connection.execute
+                results.append(run(sql, parameters).rowcount)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return results
+
+    def read(self, checksum):
+        """
+        Return the stored bytes for checksum, or None if there are none. Raises
+        ValueError if the row does not decompress or the database cannot be read.
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT data FROM schemas WHERE kind = ? AND checksum = ?", (self.extension, checksum)).fetchone()
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Could not read {self.path_for(checksum)}: {e}") from e
+        if row is None:
+            return None
+        data = self._decompress(checksum, row[0])
+        self._record_hits((checksum,))
+        return data
+
+    def read_many(self, checksums):
+        """
+        Return {checksum: bytes} for those of checksums that are stored, in batched
+        queries. Raises ValueError like read if any of the rows cannot be read.
+        """
+        checksums = list(dict.fromkeys(checksums))
+        found = {}
+        try:
+            connection = self._connection()
+            for start in range(0, len(checksums), READ_MANY_BATCH):
+                batch = checksums[start:start + READ_MANY_BATCH]
+                rows = connection.execute(
+                    f"SELECT checksum, data FROM schemas WHERE kind = ? AND checksum IN ({','.join('?' * len(batch))})",
+                    (self.extension, *batch)).fetchall()
+                for checksum, blob in rows:
+                    found[checksum] = self._decompress(checksum, blob)
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Could not read schemas from {self.path}: {e}") from e
+        if found:
+            self._record_hits(found)
+        return found
+
+    def _decompress(self, checksum, blob):
+        try:
+            return zlib.decompress(blob)
+        except zlib.error as e:
+            # Unreadable entries count as misses, like a corrupt file in a DiskStore
+            raise ValueError(f"Corrupt schema {self.path_for(checksum)}: {e}") from e
+
+    def exists(self, checksum):
+        row = self._connection().execute(
+            "SELECT 1 FROM schemas WHERE kind = ? AND checksum = ?", (self.extension, checksum)).fetchone()
+        return row is not None
+
+    def write(self, checksum, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._connection().execute(
+            "INSERT INTO schemas (kind, checksum, data, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, checksum) DO UPDATE SET data = excluded.data",
+            (self.extension, checksum, zlib.compress(data), time.time()))
+
+    def lock(self, checksum, **kwargs):
+        """
+        Return a cross-process FileLock next to the database guarding the generation of
+        checksum. Waiters stop waiting as soon as the schema is stored.
+        """
+        kwargs.setdefault("ready", lambda: self.exists(checksum))
+        directory, name = os.path.split(os.path.abspath(self.path))
+        return FileLock(os.path.join(directory, f".{name}.{checksum}{self.extension}.lock"), **kwargs)
+
+    def _record_hits(self, checksums):
+        with self._hits_lock:
+            if self._pending_pid != os.getpid():
+                # Inherited from the parent process, which flushes them itself
+                self._pending_hits = {}
+                self._pending_count = 0
+                self._pending_pid = os.getpid()
+            pending = self._pending_hits
+            for checksum in checksums:
+                pending[checksum] = pending.get(checksum, 0) + 1
+                self._pending_count += 1
+            if (self._pending_count < HIT_FLUSH_EVERY
+                    and time.monotonic() - self._flushed_at < HIT_FLUSH_SECONDS):
+                return
+        self.flush_hits(wait=False)
+
+    def flush_hits(self, wait=True):
+        """
+        Write the hit counts recorded since the last flush. With wait=False the flush is
+        skipped if the write lock is taken, and the counts are kept for the next one.
+        """
+        with self._hits_lock:
+            if not self._pending_hits or self._pending_pid != os.getpid():
+                return
+            pending, self._pending_hits = self._pending_hits, {}
+            self._pending_count = 0
+            self._flushed_at = time.monotonic()
+        now = time.time()
+        try:
+            self._transaction([(
+                "UPDATE schemas SET hit_count = hit_count + ?, last_hit = ? WHERE kind = ? AND checksum = ?",
+                [(count, now, self.extension, checksum) for checksum, count in pending.items()])], wait=wait)
+        except sqlite3.OperationalError:
+            if not wait:
+                # Write lock taken: keep the counts, the next flush retries after another
+                # HIT_FLUSH_EVERY reads or HIT_FLUSH_SECONDS
+                with self._hits_lock:
+                    for checksum, count in pending.items():
+                        self._pending_hits[checksum] = self._pending_hits.get(checksum, 0) + count
+        except sqlite3.Error:
+            # Statistics only; losing them must never fail schema generation
+            pass
+
+    def evict(self, unused_for=None, keep=None):
+        """
+        Delete schemas that have not been read for unused_for seconds, and beyond the keep
+        most recently used ones. Returns the number of rows deleted.
+        """
+        self.flush_hits()
+        statements = []
+        if unused_for is not None:
+            statements.append(("DELETE FROM schemas WHERE kind = ? AND COALESCE(last_hit, created_at) < ?",
+                               (self.extension, time.time() - unused_for)))
+        if keep is not None:
+            statements.append(("DELETE FROM schemas WHERE kind = ? AND checksum NOT IN ("
+                               "SELECT checksum FROM schemas WHERE kind = ? "
+                               "ORDER BY COALESCE(last_hit, created_at) DESC LIMIT ?)",
+                               (self.extension, self.extension, keep)))
+        return sum(self._transaction(statements)) if statements else 0
+
+    def stats(self):
+        """Return the number of stored schemas, their compressed size and total recorded hits."""
+        self.flush_hits()
+        count, size, hits = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(hit_count), 0) "
+            "FROM schemas WHERE kind = ?", (self.extension,)).fetchone()
+        return {"schemas": count, "bytes": size, "hits": hits}
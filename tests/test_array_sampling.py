@@ -0,0 +1,22 @@
+"""
+Array sampling bounds json_to_schema by the sample, with required keys still taken from
+the whole document through the checksum pass.
+"""
+from json_to_schema.checksum_generator import absent_key_paths, extract_keys_from_json
+from json_to_schema.json_schema_generator import json_to_schema, normalize_array_sampling
+
+def test_absent_keys_from_checksum_pass_match_full_walk():
+    document = {"items": [{"id": i, "tag": "x"} for i in range(500)] + [{"id": 500}]}
+    optional_fields, allow_null_fields = {"items.id"}, {"items.tag"}
+    keys = extract_keys_from_json(document, optional_fields, allow_null_fields)
+    sampling = {"size": 10, "full_scan_on_mismatch": False}
+
+    schema = json_to_schema(document, optional_fields, allow_null_fields, array_sampling=sampling,
+                            absent_keys=absent_key_paths(keys))
+    assert schema == json_to_schema(document, optional_fields, allow_null_fields, array_sampling=sampling)
+    assert "required" not in schema["properties"]["items"]["items"]
+
+def test_invalid_seed_disables_sampling():
+    assert normalize_array_sampling({"seed": "abc"}) is None
+    assert normalize_array_sampling({"paths": {"items": {"seed": [1]}}}) is None
+    assert normalize_array_sampling({"seed": "7"})["seed"] == 7
@@ -0,0 +1,91 @@
+"""
+Documents that share a checksum share one cached schema, so each of them must validate
+against the schema generated from whichever one was seen first.
+"""
+import json
+from json_to_schema.checksum_generator import get_json_checksum
+from json_to_schema.pipeline import json_pipeline
+from json_to_schema.streaming_checksum import get_json_checksum_streaming
+from xml_to_xsd.pipeline import xml_pipeline
+from xml_to_xsd.xsd_generator import generate_xsd
+
+def run_xml(tmp_path, documents):
+    xsd_dir = tmp_path / "xsd"
+    xsd_dir.mkdir()
+    results = []
+    for i, document in enumerate(documents):
+        xml_path = tmp_path / f"feed{i}.xml"
+        xml_path.write_text(document, encoding="utf-8")
+        results.append(xml_pipeline(str(xml_path), str(xsd_dir))[1])
+    return results
+
+def test_xml_repeated_element_after_single(tmp_path):
+    assert run_xml(tmp_path, [
+        "<library><book><title>A</title></book></library>",
+        "<library><book><title>A</title></book><book><title>B</title></book></library>",
+    ]) == [True, True]
+
+def test_xml_single_element_after_repeated(tmp_path):
+    assert run_xml(tmp_path, [
+        "<library><book><title>A</title></book><book><title>B</title></book></library>",
+        "<library><book><title>A</title></book></library>",
+    ]) == [True, True]
+
+def test_xml_child_absent_from_one_instance(tmp_path):
+    assert run_xml(tmp_path, [
+        "<library><book><title>A</title><year>1</year></book><book><title>B</title><year>2</year></book></library>",
+        "<library><book><title>A</title><year>1</year></book><book><title>B</title></book></library>",
+    ]) == [True, True]
+
+def run_json(tmp_path, documents):
+    schema_dir = tmp_path / "json_schema"
+    schema_dir.mkdir()
+    results = []
+    for i, document in enumerate(documents):
+        json_path = tmp_path / f"doc{i}.json"
+        json_path.write_text(json.dumps(document), encoding="utf-8")
+        results.append(json_pipeline(str(json_path), str(schema_dir))[1])
+    return results
+
+def test_json_key_missing_from_one_array_element(tmp_path):
+    assert run_json(tmp_path, [
+        {"items": [{"a": 1, "b": 2}]},
+        {"items": [{"a": 1, "b": 2}, {"a": 1}]},
+    ]) == [True, True]
+
+def test_json_key_missing_from_different_variants(tmp_path):
+    assert run_json(tmp_path, [
+        {"items": [{"a": 1, "b": 2}, {"a": 1, "c": 3}]},
+        {"items": [{"a": 1, "b": 2}, {"a": 1, "c": 3}, {"a": 1}]},
+    ]) == [True, True]
+
+def test_json_streaming_checksum_matches_flags(tmp_path):
+    json_path = tmp_path / "doc.json"
+    document = {"items": [{"a": 1, "b": {"x": 1}}, {"a": 1, "b": {}}], "n": [{"a": 1}, {"a": 2}]}
+    json_path.write_text(json.dumps(document), encoding="utf-8")
+    assert (get_json_checksum_streaming(str(json_path), frozenset(), frozenset())
+            == get_json_checksum(document, frozenset(), frozenset()))
+
+def test_xml_streaming_and_tree_share_the_xsd(tmp_path):
+    xml_path = tmp_path / "feed.xml"
+    xml_path.write_text("<library><book id='1'><title>A</title></book><book><title>B</title></book></library>",
+                        encoding="utf-8")
+    xsd_dir = tmp_path / "xsd"
+    xsd_dir.mkdir()
+    streamed = generate_xsd(str(xml_path), str(xsd_dir), streaming=True)
+    assert generate_xsd(str(xml_path), str(xsd_dir)) == streamed
+    assert len(list(xsd_dir.iterdir())) == 1
+
+def test_xml_single_pass_matches_two_pass(tmp_path):
+    xml_path = tmp_path / "feed.xml"
+    xml_path.write_text("<library><book id='1'><title>A</title><year>1</year></book>"
+                        "<book><title>B</title></book><shelf/></library>", encoding="utf-8")
+    expected_dir, fused_dir = tmp_path / "expected", tmp_path / "fused"
+    expected_dir.mkdir()
+    fused_dir.mkdir()
+    expected = generate_xsd(str(xml_path), str(expected_dir))
+    (expected_file,) = expected_dir.iterdir()
+
+    for streaming in (False, True):
+        assert generate_xsd(str(xml_path), str(fused_dir), streaming=streaming, single_pass=True) == expected
+        assert [f.name for f in fused_dir.iterdir()] == [expected_file.name]
@@ -0,0 +1,22 @@
+from schema_utils.config_index import CompiledConfig
+
+def test_regex_with_global_flags():
+    config = CompiledConfig([
+        {"file_regex": "(?i)streem\\d+\\.xml", "optional_fields": ["a"]},
+        {"file": "nama*.xml", "optional_fields": ["b"]},
+    ])
+    assert config.get_fields("STREEM1.xml")[0] == {"a"}
+    assert config.get_fields("nama2.xml")[0] == {"b"}
+    assert config.get_fields("other.xml")[0] == frozenset()
+
+def test_regex_with_numbered_backreference():
+    config = CompiledConfig([
+        {"file_regex": "nama\\d+\\.xml", "optional_fields": ["a"]},
+        {"file_regex": "(\\w)\\1\\.xml", "optional_fields": ["b"]},
+    ])
+    assert config.get_fields("aa.xml")[0] == {"b"}
+    assert config.get_fields("ab.xml")[0] == frozenset()
+
+def test_invalid_regex_is_skipped():
+    config = CompiledConfig([{"file_regex": "(", "optional_fields": ["a"]}, {"file": "x*", "optional_fields": ["b"]}])
+    assert config.get_fields("x.xml")[0] == {"b"}
@@ -0,0 +1,86 @@
+"""
+Unreadable or corrupt cache entries count as misses: the schema is generated again and
+the entry overwritten, so one bad file does not fail every document with its checksum.
+"""
+import json
+import logging
+import pytest
+from lxml import etree
+from json_to_schema.pipeline import json_pipeline
+from schema_utils.events import ROOT_LOGGER_NAME
+from schema_utils.schema_cache import SchemaCache, set_schema_cache
+from xml_to_xsd.pipeline import xml_pipeline
+from xml_to_xsd.xsd_cache import compiled_schema_cache
+from xml_to_xsd.xsd_generator import generate_xsd
+
+FEED = "<library><book><title>A</title></book><book><title>B</title></book></library>"
+
+CORRUPT_XSD = {
+    "truncated": lambda xsd: xsd[:len(xsd) // 2],
+    "not_a_schema": lambda xsd: b"<?xml version='1.0'?><library/>",
+    "does_not_compile": lambda xsd: xsd.replace(b'type="xs:string"', b'type="xs:nothing"'),
+}
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    set_schema_cache(SchemaCache())
+    compiled_schema_cache.clear()
+    yield
+    set_schema_cache(SchemaCache())
+    compiled_schema_cache.clear()
+
+@pytest.fixture
+def read_failures(caplog):
+    # The package logger does not propagate, so attach caplog's handler to it directly
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.addHandler(caplog.handler)
+    yield lambda: [r for r in caplog.records if getattr(r, "event", None) == "schema.read_failed"]
+    logger.removeHandler(caplog.handler)
+
+def cache_corrupt_xsd(tmp_path, corrupt):
+    xml_path = tmp_path / "feed.xml"
+    xml_path.write_text(FEED, encoding="utf-8")
+    xsd_dir = tmp_path / "xsd"
+    xsd_dir.mkdir()
+    generate_xsd(str(xml_path), str(xsd_dir))
+    (xsd_file,) = xsd_dir.glob("*.xsd")
+    good = xsd_file.read_bytes()
+    xsd_file.write_bytes(CORRUPT_XSD[corrupt](good))
+
+    # Start from a cold process: only the corrupt file is left
+    set_schema_cache(SchemaCache())
+    compiled_schema_cache.clear()
+    return xml_path, xsd_dir, xsd_file, good
+
+@pytest.mark.parametrize("corrupt", sorted(CORRUPT_XSD))
+def test_corrupt_xsd_is_regenerated_for_compiled_output(tmp_path, corrupt, read_failures):
+    xml_path, xsd_dir, xsd_file, good = cache_corrupt_xsd(tmp_path, corrupt)
+
+    schema, result = xml_pipeline(str(xml_path), str(xsd_dir))
+    assert isinstance(schema, etree.XMLSchema)
+    assert result is True
+    assert xsd_file.read_bytes() == good
+    assert len(read_failures()) == 1
+
+@pytest.mark.parametrize("corrupt", ["truncated", "not_a_schema"])
+def test_corrupt_xsd_is_regenerated_for_text_output(tmp_path, corrupt):
+    xml_path, xsd_dir, xsd_file, good = cache_corrupt_xsd(tmp_path, corrupt)
+
+    assert generate_xsd(str(xml_path), str(xsd_dir)) == good.decode("utf-8")
+    assert xsd_file.read_bytes() == good
+
+def test_corrupt_json_schema_is_regenerated_and_reported_once(tmp_path, read_failures):
+    json_path = tmp_path / "doc.json"
+    json_path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    schema_dir = tmp_path / "json_schema"
+    schema_dir.mkdir()
+    schema, _ = json_pipeline(str(json_path), str(schema_dir))
+    (schema_file,) = schema_dir.glob("*.json")
+    schema_file.write_text('{"type": "obj', encoding="utf-8")
+    set_schema_cache(SchemaCache())
+
+    regenerated, result = json_pipeline(str(json_path), str(schema_dir))
+    assert result is True
+    assert regenerated == schema
+    assert json.loads(schema_file.read_text(encoding="utf-8")) == schema
+    assert len(read_failures()) == 1
@@ -0,0 +1,77 @@
+"""
+FileLock breaks lock files left by crashed holders, but never takes a lock that is
+still held, even when another waiter breaks the same stale lock at the same time.
+"""
+import os
+import time
+from schema_utils.locking import FileLock
+
+STALE_AFTER = 10.0
+
+def make_lock(path, content, age=0.0):
+    path.write_text(content)
+    if age:
+        then = time.time() - age
+        os.utime(path, (then, then))
+
+def leftovers(tmp_path):
+    return sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".stale"))
+
+def test_stale_lock_is_broken(tmp_path):
+    path = tmp_path / ".ab12.json.lock"
+    make_lock(path, "crashed-host 1 0\n", age=STALE_AFTER * 2)
+
+    lock = FileLock(str(path), timeout=1.0, stale_after=STALE_AFTER)
+    assert lock.acquire() is True
+    assert path.read_text().split()[1] == str(os.getpid())
+    assert leftovers(tmp_path) == []
+    lock.release()
+    assert not path.exists()
+
+def test_fresh_lock_is_not_stolen(tmp_path):
+    path = tmp_path / ".ab12.json.lock"
+    make_lock(path, "holder 1 0\n", age=STALE_AFTER / 2)
+
+    lock = FileLock(str(path), timeout=0.05, stale_after=STALE_AFTER)
+    assert lock.acquire() is False
+    lock.release()
+    assert path.read_text() == "holder 1 0\n"
+    assert leftovers(tmp_path) == []
+
+def test_fresh_lock_moved_aside_is_put_back(tmp_path, monkeypatch):
+    path = tmp_path / ".ab12.json.lock"
+    make_lock(path, "crashed-host 1 0\n", age=STALE_AFTER * 2)
+    rename = os.rename
+
+    def rename_after_race(src, dst):
+        # Between our stat and rename another waiter broke the stale lock and a new
+        # holder created a fresh one, so we move the fresh lock aside
+        os.remove(src)
+        make_lock(path, "new-holder 2 0\n")
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", rename_after_race)
+    FileLock(str(path), stale_after=STALE_AFTER)._break_if_stale()
+    monkeypatch.setattr(os, "rename", rename)
+
+    assert path.read_text() == "new-holder 2 0\n"
+    assert leftovers(tmp_path) == []
+
+def test_lock_taken_while_breaking_is_kept(tmp_path, monkeypatch):
+    path = tmp_path / ".ab12.json.lock"
+    make_lock(path, "crashed-host 1 0\n", age=STALE_AFTER * 2)
+    rename = os.rename
+
+    def rename_after_race(src, dst):
+        os.remove(src)
+        make_lock(path, "new-holder 2 0\n")
+        rename(src, dst)
+        # And a third process took the free lock before we could put it back
+        make_lock(path, "third-holder 3 0\n")
+
+    monkeypatch.setattr(os, "rename", rename_after_race)
+    FileLock(str(path), stale_after=STALE_AFTER)._break_if_stale()
+    monkeypatch.setattr(os, "rename", rename)
+
+    assert path.read_text() == "third-holder 3 0\n"
+    assert leftovers(tmp_path) == []
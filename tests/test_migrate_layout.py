@@ -0,0 +1,93 @@
+"""
+migrate_layout moves schema files between the flat and sharded layouts in place, and
+DiskStore keeps finding them during and after the move through its .layout fallback.
+"""
+import hashlib
+import os
+import pytest
+from schema_utils.disk_store import FLAT, SHARDED, DiskStore, get_layout, read_layout
+from schema_utils.migrate_layout import migrate_layout
+
+def checksum(n):
+    return hashlib.sha256(str(n).encode()).hexdigest()
+
+CHECKSUMS = [checksum(n) for n in range(12)]
+
+@pytest.fixture
+def flat_dir(tmp_path):
+    directory = tmp_path / "json_schema"
+    directory.mkdir()
+    for c in CHECKSUMS:
+        (directory / f"{c}.json").write_bytes(c.encode())
+    # Not schemas: left where they are
+    (directory / "notes.json").write_bytes(b"{}")
+    (directory / f".{CHECKSUMS[0]}.json.lock").write_bytes(b"")
+    get_layout(str(directory), refresh=True)
+    return directory
+
+def files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names if name != ".layout")
+
+def assert_all_readable(store):
+    for c in CHECKSUMS:
+        assert store.read(c) == c.encode()
+
+def test_flat_to_sharded_and_back(flat_dir):
+    before = files(flat_dir)
+
+    assert migrate_layout(str(flat_dir), ".json") == len(CHECKSUMS)
+    assert read_layout(str(flat_dir)) == SHARDED
+    for c in CHECKSUMS:
+        assert (flat_dir / c[:2] / c[2:4] / f"{c}.json").is_file()
+    assert (flat_dir / "notes.json").is_file()
+    assert_all_readable(DiskStore(str(flat_dir), ".json"))
+
+    assert migrate_layout(str(flat_dir), "json", FLAT) == len(CHECKSUMS)
+    assert read_layout(str(flat_dir)) == FLAT
+    assert files(flat_dir) == before
+    assert [p for p in flat_dir.iterdir() if p.is_dir()] == []
+
+def test_rerun_is_idempotent(flat_dir):
+    migrate_layout(str(flat_dir), ".json")
+    sharded = files(flat_dir)
+    assert migrate_layout(str(flat_dir), ".json") == 0
+    assert files(flat_dir) == sharded
+
+    migrate_layout(str(flat_dir), ".json", FLAT)
+    flat = files(flat_dir)
+    assert migrate_layout(str(flat_dir), ".json", FLAT) == 0
+    assert files(flat_dir) == flat
+
+def test_unknown_layout(flat_dir):
+    with pytest.raises(ValueError):
+        migrate_layout(str(flat_dir), ".json", "nested")
+
+@pytest.mark.parametrize("target", [SHARDED, FLAT])
+def test_reads_during_and_after_migration(flat_dir, monkeypatch, target):
+    if target == FLAT:
+        migrate_layout(str(flat_dir), ".json")
+    source = FLAT if target == SHARDED else SHARDED
+    # A reader in another process still has the old layout cached
+    stale = DiskStore(str(flat_dir), ".json", layout=source)
+
+    replace = os.replace
+    moves = []
+
+    def replace_and_read(src, dst):
+        replace(src, dst)
+        if dst.endswith(".json"):
+            moves.append(dst)
+            # Half-migrated: readers of both layouts find every schema
+            assert_all_readable(DiskStore(str(flat_dir), ".json", layout=source))
+            assert_all_readable(DiskStore(str(flat_dir), ".json", layout=target))
+
+    monkeypatch.setattr(os, "replace", replace_and_read)
+    migrate_layout(str(flat_dir), ".json", target)
+    monkeypatch.setattr(os, "replace", replace)
+    assert len(moves) == len(CHECKSUMS)
+
+    assert_all_readable(stale)
+    # The miss on the old layout made the reader pick up the recorded one
+    assert stale.layout == target
+    assert stale.path_for(CHECKSUMS[0]) == DiskStore(str(flat_dir), ".json").path_for(CHECKSUMS[0])
@@ -0,0 +1,115 @@
+"""
+Round trips through the packed schema archive: build_pack writes a sorted index that
+PackStore binary-searches in place.
+"""
+import hashlib
+import json
+import pytest
+from json_to_schema.pipeline import json_pipeline
+from schema_utils.disk_store import DiskStore
+from schema_utils.pack_store import HEADER, PackStore, build_pack
+from schema_utils.schema_cache import SchemaCache, set_schema_cache
+
+def checksum(n):
+    return hashlib.sha256(str(n).encode()).hexdigest()
+
+@pytest.fixture
+def schema_dirs(tmp_path):
+    json_dir, xsd_dir = tmp_path / "json_schema", tmp_path / "xsd"
+    json_dir.mkdir()
+    xsd_dir.mkdir()
+    schemas = {}
+    for n in range(20):
+        schemas[(".json", checksum(n))] = json.dumps({"n": n}).encode()
+        (json_dir / f"{checksum(n)}.json").write_bytes(schemas[(".json", checksum(n))])
+    # XSDs in the sharded layout; shares a checksum with a JSON schema
+    for n in (3, 100):
+        data = f"<xs:schema n='{n}'/>".encode()
+        schemas[(".xsd", checksum(n))] = data
+        shard = xsd_dir / checksum(n)[:2] / checksum(n)[2:4]
+        shard.mkdir(parents=True)
+        (shard / f"{checksum(n)}.xsd").write_bytes(data)
+    (json_dir / "notes.json").write_bytes(b"{}")
+    return json_dir, xsd_dir, schemas
+
+def test_round_trip(tmp_path, schema_dirs):
+    json_dir, xsd_dir, schemas = schema_dirs
+    pack_path = str(tmp_path / "schemas.pack")
+    assert build_pack(pack_path, str(json_dir), str(xsd_dir)) == len(schemas)
+
+    for extension in (".json", ".xsd"):
+        store = PackStore(pack_path, extension)
+        expected = {c: data for (e, c), data in schemas.items() if e == extension}
+        assert sorted(store.checksums()) == sorted(expected)
+        for c, data in expected.items():
+            assert store.read(c) == data
+            assert store.read(c.upper()) == data
+            assert store.exists(c)
+        assert store.read_many([*expected, checksum(999)]) == expected
+
+    store = PackStore(pack_path, ".xsd")
+    assert store.read(checksum(0)) is None
+    assert store.read(checksum(999)) is None
+    assert store.read("not-hex") is None
+    assert store.read(checksum(3)[:10]) is None
+    with pytest.raises(PermissionError):
+        store.write(checksum(999), b"{}")
+
+def test_empty_pack(tmp_path):
+    pack_path = str(tmp_path / "empty.pack")
+    assert build_pack(pack_path) == 0
+    store = PackStore(pack_path, ".json")
+    assert list(store.checksums()) == []
+    assert store.read(checksum(0)) is None
+    assert store.read_many([checksum(0)]) == {}
+
+def test_not_a_pack(tmp_path):
+    path = tmp_path / "bogus.pack"
+    path.write_bytes(b"x" * HEADER.size)
+    with pytest.raises(ValueError):
+        PackStore(str(path), ".json")
+
+@pytest.mark.parametrize("cut", ["data", "index"])
+def test_truncated_pack(tmp_path, schema_dirs, cut):
+    json_dir, xsd_dir, schemas = schema_dirs
+    pack_path = tmp_path / "schemas.pack"
+    build_pack(str(pack_path), str(json_dir), str(xsd_dir))
+    content = pack_path.read_bytes()
+    pack_path.write_bytes(content[:-5] if cut == "data" else content[:HEADER.size + 100])
+
+    json_store, xsd_store = PackStore(str(pack_path), ".json"), PackStore(str(pack_path), ".xsd")
+    last_xsd = max(c for e, c in schemas if e == ".xsd")
+    if cut == "data":
+        # Data follows the index order, so only the last XSD was cut short
+        with pytest.raises(ValueError):
+            xsd_store.read(last_xsd)
+        assert not xsd_store.exists(last_xsd)
+        assert all(json_store.read(c) == data for (e, c), data in schemas.items() if e == ".json")
+    else:
+        # Entries left in the index point past the end; the lost ones are missing
+        with pytest.raises(ValueError):
+            json_store.read(min(c for e, c in schemas if e == ".json"))
+        assert xsd_store.read(last_xsd) is None
+
+def test_truncated_pack_is_regenerated_into_fallback(tmp_path):
+    set_schema_cache(SchemaCache())
+    json_path = tmp_path / "doc.json"
+    json_path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    json_dir = tmp_path / "json_schema"
+    json_dir.mkdir()
+    schema, _ = json_pipeline(str(json_path), str(json_dir))
+
+    pack_path = tmp_path / "schemas.pack"
+    build_pack(str(pack_path), str(json_dir))
+    pack_path.write_bytes(pack_path.read_bytes()[:-5])
+    fallback = tmp_path / "fallback"
+    fallback.mkdir()
+    set_schema_cache(SchemaCache())
+    try:
+        store = PackStore(str(pack_path), ".json", fallback=str(fallback))
+        regenerated, result = json_pipeline(str(json_path), store)
+        assert result is True
+        assert regenerated == schema
+        assert DiskStore(str(fallback), ".json").exists(schema["checksum_id"])
+    finally:
+        set_schema_cache(SchemaCache())
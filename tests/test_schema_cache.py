@@ -0,0 +1,32 @@
+"""
+The SchemaCache TTL applies to everything derived from its entries, including the
+compiled XSDs of the XML path.
+"""
+import time
+from schema_utils.schema_cache import SchemaCache, get_schema_cache, set_schema_cache
+from xml_to_xsd.pipeline import xml_pipeline
+from xml_to_xsd.xsd_cache import compiled_schema_cache
+
+OTHER_XSD = b"""<?xml version='1.0' encoding='UTF-8'?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"><xs:element name="other" type="xs:string"/></xs:schema>
+"""
+
+def test_compiled_xsd_expires_with_schema_cache_entry(tmp_path):
+    xml_path = tmp_path / "feed.xml"
+    xml_path.write_text("<library><book>A</book></library>", encoding="utf-8")
+    xsd_dir = tmp_path / "xsd"
+    xsd_dir.mkdir()
+    set_schema_cache(SchemaCache(ttl=0.05))
+    compiled_schema_cache.clear()
+    try:
+        assert xml_pipeline(str(xml_path), str(xsd_dir))[1] is True
+        assert xml_pipeline(str(xml_path), str(xsd_dir))[1] is True
+        (xsd_file,) = xsd_dir.glob("*.xsd")
+        xsd_file.write_bytes(OTHER_XSD)
+
+        time.sleep(0.1)
+        assert xml_pipeline(str(xml_path), str(xsd_dir))[1] is False
+        assert get_schema_cache().stats()["expirations"] == 1
+    finally:
+        set_schema_cache(SchemaCache())
+        compiled_schema_cache.clear()
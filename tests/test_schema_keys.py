@@ -0,0 +1,37 @@
+"""
+Checksums are only unique within one schema store: compiled schemas and validators
+warmed by one store must not be served for another.
+"""
+import json
+from json_to_schema.pipeline import json_pipeline
+from xml_to_xsd.pipeline import xml_pipeline
+
+OTHER_XSD = b"""<?xml version='1.0' encoding='UTF-8'?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"><xs:element name="other" type="xs:string"/></xs:schema>
+"""
+
+def test_compiled_xsd_is_keyed_by_store(tmp_path):
+    xml_path = tmp_path / "feed.xml"
+    xml_path.write_text("<library><book>A</book></library>", encoding="utf-8")
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    assert xml_pipeline(str(xml_path), str(first))[1] is True
+    (xsd_file,) = first.glob("*.xsd")
+    (second / xsd_file.name).write_bytes(OTHER_XSD)
+    assert xml_pipeline(str(xml_path), str(second))[1] is False
+
+def test_json_validator_is_not_shared_across_stores(tmp_path):
+    json_path = tmp_path / "doc.json"
+    json_path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    assert json_pipeline(str(json_path), str(first))[1] is True
+    (schema_file,) = first.glob("*.json")
+    other = json.loads(schema_file.read_text(encoding="utf-8"))
+    other["properties"]["a"] = {"type": "string"}
+    (second / schema_file.name).write_text(json.dumps(other), encoding="utf-8")
+    assert json_pipeline(str(json_path), str(second))[1] is False
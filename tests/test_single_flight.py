@@ -0,0 +1,80 @@
+"""
+SingleFlight runs one call per key at a time and hands its result, or its exception, to
+every caller that arrived while it ran.
+"""
+import threading
+import time
+from schema_utils.single_flight import SingleFlight
+
+WAITERS = 4
+
+def run_concurrently(flight, key, fn):
+    """Start a leader and WAITERS callers that all join its call; returns their outcomes."""
+    outcomes = [None] * (WAITERS + 1)
+
+    def call(i):
+        try:
+            outcomes[i] = ("result", flight.do(key, fn))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(WAITERS + 1)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def wait_for_waiters(flight):
+    deadline = time.monotonic() + 5.0
+    while flight.stats()["shared"] < WAITERS:
+        assert time.monotonic() < deadline, "callers never joined the call in flight"
+        time.sleep(0.001)
+
+def test_result_is_shared():
+    flight, release = SingleFlight(), threading.Event()
+    result = object()
+
+    def fn():
+        release.wait(5.0)
+        return result
+
+    threads, outcomes = run_concurrently(flight, "ab12", fn)
+    wait_for_waiters(flight)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes == [("result", result)] * (WAITERS + 1)
+    assert flight.stats() == {"executions": 1, "shared": WAITERS, "in_flight": 0}
+
+def test_exception_reaches_every_waiter():
+    flight, release = SingleFlight(), threading.Event()
+    error = OSError("disk full")
+
+    def fn():
+        release.wait(5.0)
+        raise error
+
+    threads, outcomes = run_concurrently(flight, "ab12", fn)
+    wait_for_waiters(flight)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(outcome == ("error", error) for outcome in outcomes)
+    assert flight.stats() == {"executions": 1, "shared": WAITERS, "in_flight": 0}
+
+    # The failed call is forgotten, so the next caller runs again
+    assert flight.do("ab12", lambda: "retried") == "retried"
+    assert flight.stats()["executions"] == 2
+
+def test_other_keys_do_not_wait():
+    flight, release = SingleFlight(), threading.Event()
+    leader = threading.Thread(target=flight.do, args=("ab12", lambda: release.wait(5.0)))
+    leader.start()
+    try:
+        while flight.stats()["in_flight"] == 0:
+            time.sleep(0.001)
+        assert flight.do("cd34", lambda: "other") == "other"
+    finally:
+        release.set()
+        leader.join()
@@ -0,0 +1,155 @@
+"""
+SQLiteStore keeps zlib-compressed schemas in one database; rows that cannot be read
+count as misses, like corrupt files in a DiskStore.
+"""
+import json
+import sqlite3
+import threading
+import time
+import pytest
+from json_to_schema.pipeline import json_pipeline
+from schema_utils import sqlite_store
+from schema_utils.schema_cache import SchemaCache, set_schema_cache
+from schema_utils.schema_store import SchemaStore
+from schema_utils.sqlite_store import SQLiteStore
+
+@pytest.fixture(autouse=True)
+def fresh_schema_cache():
+    set_schema_cache(SchemaCache())
+    yield
+    set_schema_cache(SchemaCache())
+
+def corrupt_row(db_path, checksum):
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("UPDATE schemas SET data = x'00112233' WHERE checksum = ?", (checksum,))
+
+def test_corrupt_row_raises_value_error(tmp_path):
+    db_path = str(tmp_path / "schemas.sqlite")
+    store = SQLiteStore(db_path, ".json")
+    store.write("ab12", b'{"type": "object"}')
+    corrupt_row(db_path, "ab12")
+
+    with pytest.raises(ValueError):
+        store.read("ab12")
+    with pytest.raises(ValueError):
+        store.read_many(["ab12"])
+
+def test_corrupt_row_is_regenerated(tmp_path):
+    json_path = tmp_path / "doc.json"
+    json_path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    db_path = str(tmp_path / "schemas.sqlite")
+    store = SQLiteStore(db_path, ".json")
+
+    schema, _ = json_pipeline(str(json_path), store)
+    corrupt_row(db_path, schema["checksum_id"])
+    set_schema_cache(SchemaCache())
+
+    regenerated, result = json_pipeline(str(json_path), store)
+    assert result is True
+    assert regenerated == schema
+    assert json.loads(store.read(schema["checksum_id"])) == schema
+
+def hit_counts(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return dict(connection.execute("SELECT checksum, hit_count FROM schemas"))
+
+def test_write_and_read(tmp_path):
+    store = SQLiteStore(str(tmp_path / "schemas.sqlite"), ".json")
+    xsd_store = SQLiteStore(store.path, ".xsd")
+    store.write("ab12", b'{"a": 1}')
+    xsd_store.write("ab12", "<xs:schema/>")
+
+    assert store.read("ab12") == b'{"a": 1}'
+    assert xsd_store.read("ab12") == b"<xs:schema/>"
+    assert store.read("cd34") is None
+    assert store.exists("ab12") and not store.exists("cd34")
+
+    store.write("ab12", b'{"a": 2}')
+    assert store.read("ab12") == b'{"a": 2}'
+    assert store.stats()["schemas"] == 1
+
+def test_read_many_spans_batches(tmp_path):
+    store = SQLiteStore(str(tmp_path / "schemas.sqlite"), ".json")
+    checksums = [f"{n:04x}" for n in range(sqlite_store.READ_MANY_BATCH + 20)]
+    for checksum in checksums[::2]:
+        store.write(checksum, checksum.encode())
+
+    found = store.read_many(checksums + checksums[:4])
+    assert found == {checksum: checksum.encode() for checksum in checksums[::2]}
+
+def test_hits_are_flushed_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "HIT_FLUSH_EVERY", 4)
+    monkeypatch.setattr(sqlite_store, "HIT_FLUSH_SECONDS", 3600)
+    db_path = str(tmp_path / "schemas.sqlite")
+    store = SQLiteStore(db_path, ".json")
+    store.write("ab12", b"{}")
+    store.write("cd34", b"{}")
+
+    for _ in range(3):
+        store.read("ab12")
+    assert hit_counts(db_path) == {"ab12": 0, "cd34": 0}
+    store.read_many(["cd34"])
+    assert hit_counts(db_path) == {"ab12": 3, "cd34": 1}
+
+    store.read("ab12")
+    assert store.stats()["hits"] == 5
+
+def test_read_flush_does_not_wait_for_write_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "HIT_FLUSH_EVERY", 1)
+    db_path = str(tmp_path / "schemas.sqlite")
+    store = SQLiteStore(db_path, ".json", timeout=5.0)
+    store.write("ab12", b"{}")
+
+    writer = sqlite3.connect(db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        # The flush gives up at once instead of waiting for the timeout
+        started = time.monotonic()
+        assert store.read("ab12") == b"{}"
+        assert store.read("ab12") == b"{}"
+        assert time.monotonic() - started < 1.0
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    store.flush_hits()
+    assert hit_counts(db_path) == {"ab12": 2}
+
+def test_concurrent_writers(tmp_path):
+    db_path = str(tmp_path / "schemas.sqlite")
+    errors = []
+
+    def write(worker):
+        # Each writer has its own store and connections, like a separate process
+        store = SQLiteStore(db_path, ".json")
+        try:
+            for n in range(25):
+                store.write(f"{worker:02x}{n:04x}", f"{worker}:{n}".encode())
+                store.read(f"{worker:02x}{0:04x}")
+            store.flush_hits()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    store = SQLiteStore(db_path, ".json")
+    stats = store.stats()
+    assert (stats["schemas"], stats["hits"]) == (200, 200)
+    assert store.read("030011") == b"3:17"
+
+def test_incomplete_store_cannot_be_instantiated():
+    class ReadOnlyStore(SchemaStore):
+        key = "read-only"
+
+        def path_for(self, checksum):
+            return checksum
+
+        def read(self, checksum):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
@@ -0,0 +1,54 @@
+"""
+schema_generator returns one status record per file, with the same fields for JSON and
+XML files, including the checksum their schema is stored under.
+"""
+import json
+import pytest
+from schema_generator import process_xml_file, schema_generator
+from schema_utils.schema_cache import SchemaCache, set_schema_cache
+from xml_to_xsd.checksum_generator import get_xml_checksum
+from xml_to_xsd.xml_parser import load_xml
+
+FIELDS = {"file", "type", "valid", "error", "checksum"}
+
+@pytest.fixture(autouse=True)
+def fresh_schema_cache():
+    set_schema_cache(SchemaCache())
+    yield
+    set_schema_cache(SchemaCache())
+
+@pytest.fixture
+def dirs(tmp_path):
+    paths = {name: tmp_path / name for name in ("json", "json_schema", "xml", "xsd")}
+    for path in paths.values():
+        path.mkdir()
+    (paths["json"] / "doc.json").write_text(json.dumps({"a": 1}), encoding="utf-8")
+    (paths["json"] / "broken.json").write_text("{", encoding="utf-8")
+    (paths["xml"] / "feed.xml").write_text("<library><book>A</book></library>", encoding="utf-8")
+    (paths["xml"] / "broken.xml").write_text("<library>", encoding="utf-8")
+    config = tmp_path / "config.json"
+    config.write_text("{}", encoding="utf-8")
+    return paths, str(config)
+
+def test_records_carry_checksums(dirs):
+    paths, config = dirs
+    records = schema_generator(str(paths["json"]), str(paths["json_schema"]), str(paths["xml"]),
+                               str(paths["xsd"]), config)
+
+    assert all(set(record) == FIELDS for record in records)
+    by_file = {record["file"].rsplit("/", 1)[1]: record for record in records}
+    assert by_file["broken.json"]["checksum"] is None
+    assert by_file["broken.xml"]["checksum"] is None
+    (schema_file,) = paths["json_schema"].glob("*.json")
+    assert by_file["doc.json"]["checksum"] == schema_file.stem
+    (xsd_file,) = paths["xsd"].glob("*.xsd")
+    assert by_file["feed.xml"]["checksum"] == xsd_file.stem
+
+def test_xml_record_without_precomputed_checksum(dirs):
+    paths, config = dirs
+    xml_path = str(paths["xml"] / "feed.xml")
+    status = process_xml_file(xml_path, str(paths["xsd"]), config)
+
+    assert status["valid"] is True
+    assert status["checksum"] == get_xml_checksum(load_xml(xml_path)[1], set(), set())
+    assert process_xml_file(str(paths["xml"] / "broken.xml"), str(paths["xsd"]), config)["checksum"] is None
@@ -0,0 +1,50 @@
+"""
+Worker processes send their log records to the parent, which writes them with the
+handlers and format it configured, as if the files had been processed in-process.
+"""
+import io
+import json
+import pytest
+from schema_generator import schema_generator
+from schema_utils.events import WARNING, configure_logging
+from schema_utils.schema_cache import SchemaCache, set_schema_cache
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    set_schema_cache(SchemaCache())
+    yield
+    configure_logging()
+    set_schema_cache(SchemaCache())
+
+def run(tmp_path, workers):
+    paths = {name: tmp_path / name for name in ("json", "json_schema", "xml", "xsd")}
+    for path in paths.values():
+        path.mkdir()
+    for n in range(6):
+        (paths["json"] / f"doc{n}.json").write_text(json.dumps({f"k{n}": n}), encoding="utf-8")
+        (paths["xml"] / f"feed{n}.xml").write_text(f"<feed><item{n}>x</item{n}></feed>", encoding="utf-8")
+    (paths["json"] / "broken.json").write_text("{", encoding="utf-8")
+    config = tmp_path / "config.json"
+    config.write_text("{}", encoding="utf-8")
+    return schema_generator(str(paths["json"]), str(paths["json_schema"]), str(paths["xml"]), str(paths["xsd"]),
+                            str(config), workers=workers)
+
+def test_worker_records_use_parent_handlers(tmp_path):
+    stream = io.StringIO()
+    configure_logging(structured=True, stream=stream)
+    run(tmp_path, workers=2)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    generated = [event for event in events if event["event"] == "schema.generated"]
+    assert len(generated) == 12
+    assert all("checksum" in event for event in generated)
+    assert [event["level"] for event in events if event["event"] == "input.invalid"] == ["ERROR"]
+
+def test_worker_records_respect_parent_level(tmp_path, capsys):
+    stream = io.StringIO()
+    configure_logging(level=WARNING, stream=stream)
+    run(tmp_path, workers=2)
+
+    # Only the broken file is reported, and the console handler was not reinstalled
+    assert len(stream.getvalue().splitlines()) == 1
+    assert capsys.readouterr().out == ""
@@ -1,10 +1,144 @@
 import json
 import hashlib
+from lxml import etree
+
+# Suffixes of the occurrence flags added to the paths; neither can occur in an XML name
+REPEATS_FLAG = "+"
+ABSENT_FLAG = "?"
+
+def local_name(tag):
+    """Returns the tag without its {namespace} prefix."""
+    return tag.split('}')[-1] if '}' in tag else tag
+
+class OccurrenceTracker:
+    """
+    Records, per element path, whether the element repeats within one instance of its
+    parent and whether some instance of its parent lacks it.
+
+    Both flags go into the checksum, because the generated XSD depends on them
+    (maxOccurs="unbounded" and minOccurs="0"). Documents that differ only in how often an
+    element repeats or how often it is missing still share a checksum. Feed it
+    start(path) when an element opens and end() when it closes. Memory grows with the
+    number of distinct paths.
+    """
+
+    __slots__ = ("instances", "containing", "parents", "repeats", "_open")
+
+    def __init__(self):
+        self.instances = {}     # path -> number of element instances
+        self.containing = {}    # path -> number of parent instances containing the element
+        self.parents = {}       # path -> parent path
+        self.repeats = set()
+        # Open elements: (path, child path -> count in this instance)
+        self._open = []
+
+    def start(self, path):
+        self.instances[path] = self.instances.get(path, 0) + 1
+        if self._open:
+            counts = self._open[-1][1]
+            counts[path] = counts.get(path, 0) + 1
+        self._open.append((path, {}))
+
+    def end(self):
+        path, counts = self._open.pop()
+        for child_path, count in counts.items():
+            self.containing[child_path] = self.containing.get(child_path, 0) + 1
+            self.parents[child_path] = path
+            if count > 1:
+                self.repeats.add(child_path)
+
+    def flags(self):
+        """Returns the flag entries: "a.b+" if a.b repeats, "a.b?" if some a lacks a b."""
+        flags = {f"{path}{REPEATS_FLAG}" for path in self.repeats}
+        for path, count in self.containing.items():
+            if count < self.instances[self.parents[path]]:
+                flags.add(f"{path}{ABSENT_FLAG}")
+        return flags
 
 def extract_elements_from_xml(root):
+    """
+    Collects the structural paths of an XML tree as a set.
+
+    Repeated elements share one path, so the result grows with the number of distinct
+    element and attribute paths, not with the number of element instances. Each path that
+    repeats or is sometimes absent also gets an occurrence flag (see OccurrenceTracker).
+    Comments and processing instructions carry no structure and are skipped.
+
+    The tree is walked with etree.iterwalk and an explicit path stack, so there is no
+    Python recursion and no depth limit.
+    """
+    elements = set()
+    if not isinstance(root.tag, str):
+        return elements
+    path = []
+    occurrences = OccurrenceTracker()
+
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            tag_name = local_name(element.tag)
+            full_path = f"{path[-1]}.{tag_name}" if path else tag_name
+            elements.add(full_path)
+            for attr_name in element.keys():
+                elements.add(f"{full_path}@{attr_name}")
+            path.append(full_path)
+            occurrences.start(full_path)
+        else:
+            path.pop()
+            occurrences.end()
+
+    elements |= occurrences.flags()
+    return elements
+
+def extract_elements_streaming(xml_path):
+    """
+    Collects the same paths as extract_elements_from_xml while streaming the file with
+    etree.iterparse. Each element is cleared once it ends and dropped from its parent, so
+    memory stays constant however many records the feed holds, and large text such as
+    CDATA <story> bodies is released immediately.
+
+    Parameters:
+    - xml_path (str): The path to the XML file.
+
+    Returns:
+    - set: Element paths ("a.b"), attribute paths ("a.b@attr") and occurrence flags.
+    """
+    elements = set()
+    path = []
+    occurrences = OccurrenceTracker()
+
+    for event, element in etree.iterparse(xml_path, events=("start", "end"),
+                                          remove_comments=True, remove_pis=True):
+        if event == "start":
+            tag_name = local_name(element.tag)
+            full_path = f"{path[-1]}.{tag_name}" if path else tag_name
+            elements.add(full_path)
+            for attr_name in element.keys():
+                elements.add(f"{full_path}@{attr_name}")
+            path.append(full_path)
+            occurrences.start(full_path)
+        else:
+            path.pop()
+            occurrences.end()
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    elements |= occurrences.flags()
+    return elements
+
+def extract_elements_from_xml_legacy(root):
+    """
+    Element extraction used before checksums were deduplicated: one entry per element
+    instance. Only kept so that migrate_checksums can map old XSD files to their new checksum.
+    Walked from an explicit stack, so deep documents do not hit the recursion limit; the
+    checksum sorts the paths, so the visiting order does not matter.
+    """
     elements = []
+    # Elements still to visit, with the path of their parent
+    stack = [(root, "")]
 
-    def recurse(element, path=""):
+    while stack:
+        element, path = stack.pop()
         tag_raw = element.tag
         tag_text = tag_raw() if callable(tag_raw) else tag_raw
         tag_str = str(tag_text)
@@ -17,10 +151,8 @@ def extract_elements_from_xml(root):
             attr_path = f"{full_path}@{attr_name}"
             elements.append(attr_path)
 
-        for child in element:
-            recurse(child, full_path)
-    
-    recurse(root)
+        stack.extend((child, full_path) for child in element)
+
     return elements
 
 def generate_checksum_from_elements(element_list, optional_fields=None, allow_null_fields=None):
@@ -28,7 +160,7 @@ def generate_checksum_from_elements(element_list, optional_fields=None, allow_nu
     Generate checksum from elements with config modifications.
     
     Parameters:
-    - element_list: List of element paths
+    - element_list: Iterable of element paths
     - optional_fields: Set of optional field paths
     - nullable_fields: Set of nullable field paths
     """
@@ -62,4 +194,21 @@ def get_xml_checksum(root, optional_fields=None, allow_null_fields=None):
     - nullable_fields: Set of nullable field paths
     """
     elements = extract_elements_from_xml(root)
-    return generate_checksum_from_elements(elements, optional_fields, allow_null_fields)
\ No newline at end of file
+    return generate_checksum_from_elements(elements, optional_fields, allow_null_fields)
+
+def get_xml_checksum_streaming(xml_path, optional_fields=None, allow_null_fields=None):
+    """
+    Get the same checksum as get_xml_checksum without building the XML tree.
+
+    Parameters:
+    - xml_path: Path to the XML file
+    - optional_fields: Set of optional field paths
+    - nullable_fields: Set of nullable field paths
+    """
+    elements = extract_elements_streaming(xml_path)
+    return generate_checksum_from_elements(elements, optional_fields, allow_null_fields)
+
+
+def get_legacy_xml_checksum(root, optional_fields=None, allow_null_fields=None):
+    elements = extract_elements_from_xml_legacy(root)
+    return generate_checksum_from_elements(elements, optional_fields, allow_null_fields)
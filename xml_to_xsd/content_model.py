@@ -0,0 +1,280 @@
+from lxml import etree
+from .checksum_generator import ABSENT_FLAG, REPEATS_FLAG, local_name
+from .schema_inferer import DATE_OR_DATETIME, TypeAccumulator
+from schema_utils.events import DEBUG, get_logger
+
+_log = get_logger(__name__)
+
+XS = "{http://www.w3.org/2001/XMLSchema}"
+NS_MAP = {"xs": "http://www.w3.org/2001/XMLSchema"}
+
+class ElementModel:
+    """
+    Inferred content model of every element instance sharing one path.
+
+    Repeated siblings are merged into one model. repeats and sometimes_absent record
+    whether the element appeared more than once in, or was missing from, some parent
+    instance; these are the occurrence flags of the checksum, and occurrence constraints
+    are emitted from them alone, never from counts. Leaf and attribute types are widened
+    across all instances by TypeAccumulators.
+    """
+
+    __slots__ = ("name", "path", "children", "order", "ordered", "attributes", "text_type",
+                 "has_text", "is_complex", "instances", "repeats", "sometimes_absent")
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.children = {}      # child name -> ElementModel
+        self.order = []         # child names in document order
+        self.ordered = True     # False once siblings were seen out of order or interleaved
+        self.attributes = {}    # attribute name -> TypeAccumulator
+        self.text_type = None   # TypeAccumulator of leaf texts
+        self.has_text = False
+        self.is_complex = False
+        self.instances = 0
+        self.repeats = False
+        self.sometimes_absent = False
+
+class ContentModelBuilder:
+    """
+    Builds an ElementModel tree from start/end events, one element instance at a time.
+
+    Feed it with start(tag, attributes) when an element opens and end(text) when it
+    closes. Memory grows with the number of distinct paths, never with the number of
+    element instances.
+
+    Parameters:
+    - parent_path (str): Path of the root element's parent, when modelling a subtree.
+    - sample_limit (int): Optional cap on the values type-checked per path, see TypeAccumulator.
+    """
+
+    def __init__(self, parent_path=None, sample_limit=None):
+        self.root = None
+        self.parent_path = parent_path
+        self.sample_limit = sample_limit
+        # Open elements: [model, child counts, order index of the previous child, has attributes]
+        self._stack = []
+
+    def start(self, tag, attributes):
+        name = local_name(tag)
+        stack = self._stack
+
+        if not stack:
+            if self.root is None:
+                path = f"{self.parent_path}.{name}" if self.parent_path else name
+                self.root = ElementModel(name, path)
+            model = self.root
+        else:
+            frame = stack[-1]
+            parent, counts, last_index = frame[0], frame[1], frame[2]
+            parent.is_complex = True
+
+            model = parent.children.get(name)
+            if model is None:
+                model = ElementModel(name, f"{parent.path}.{name}")
+                parent.children[name] = model
+                # Place a new child right after the sibling that preceded it
+                index = last_index + 1
+                parent.order.insert(index, name)
+                if parent.instances > 1:
+                    # Earlier instances of the parent did not contain it
+                    model.sometimes_absent = True
+            else:
+                index = parent.order.index(name)
+
+            if name in counts:
+                if index != last_index:
+                    parent.ordered = False
+                counts[name] += 1
+            else:
+                if index <= last_index:
+                    parent.ordered = False
+                counts[name] = 1
+            frame[2] = index
+
+        model.instances += 1
+        has_attributes = False
+        for attr_name, attr_value in attributes:
+            has_attributes = True
+            accumulator = model.attributes.get(attr_name)
+            if accumulator is None:
+                accumulator = model.attributes[attr_name] = TypeAccumulator(self.sample_limit)
+            accumulator.add(attr_value)
+        if has_attributes:
+            model.is_complex = True
+
+        stack.append([model, {}, -1, has_attributes])
+
+    def end(self, text):
+        model, counts, _, has_attributes = self._stack.pop()
+
+        if text is not None and text.strip() != "":
+            model.has_text = True
+        if not counts and not has_attributes:
+            if model.text_type is None:
+                model.text_type = TypeAccumulator(self.sample_limit)
+            model.text_type.add(text)
+
+        for child_name, child in model.children.items():
+            count = counts.get(child_name, 0)
+            if count == 0:
+                child.sometimes_absent = True
+            elif count > 1:
+                child.repeats = True
+
+def infer_model_streaming(xml_path, sample_limit=None):
+    """
+    Infers the content model of an XML file by streaming it with etree.iterparse.
+
+    Each element is cleared as soon as it ends, so arbitrarily large feeds are processed in
+    memory proportional to their structure rather than their size.
+
+    Parameters:
+    - xml_path (str): The path to the XML file.
+    - sample_limit (int): Optional cap on the values type-checked per path.
+
+    Returns:
+    - ElementModel: Model of the root element.
+    """
+    builder = ContentModelBuilder(sample_limit=sample_limit)
+    for event, element in etree.iterparse(xml_path, events=("start", "end"),
+                                          remove_comments=True, remove_pis=True):
+        if event == "start":
+            builder.start(element.tag, element.items())
+        else:
+            builder.end(element.text)
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    return builder.root
+
+def infer_model_from_element(element, parent_path=None, sample_limit=None):
+    """
+    Infers the content model of an in-memory element and its descendants, merging
+    repeated siblings exactly like infer_model_streaming. The subtree is walked with
+    etree.iterwalk, so arbitrarily deep documents need no Python recursion.
+
+    Parameters:
+    - element (etree._Element): The element to model.
+    - parent_path (str): Dotted path of the element's parent, if it is not the root.
+    - sample_limit (int): Optional cap on the values type-checked per path.
+
+    Returns:
+    - ElementModel: Model of element.
+    """
+    builder = ContentModelBuilder(parent_path, sample_limit)
+    start, end = builder.start, builder.end
+    for event, el in etree.iterwalk(element, events=("start", "end")):
+        if event == "start":
+            start(el.tag, el.items())
+        else:
+            end(el.text)
+    return builder.root
+
+def model_paths(model):
+    """
+    Returns the structural paths of a content model: the same set extract_elements_from_xml
+    returns for the document it was inferred from, occurrence flags included, so a single
+    pass can produce both the checksum and the XSD.
+    """
+    paths = set()
+    stack = [model]
+    while stack:
+        m = stack.pop()
+        paths.add(m.path)
+        for attr_name in m.attributes:
+            paths.add(f"{m.path}@{attr_name}")
+        for child in m.children.values():
+            if child.repeats:
+                paths.add(f"{child.path}{REPEATS_FLAG}")
+            if child.sometimes_absent:
+                paths.add(f"{child.path}{ABSENT_FLAG}")
+            stack.append(child)
+    return paths
+
+def set_simple_type(definition, xsd_type):
+    """Sets the type of an xs:element or xs:attribute, declaring unions inline."""
+    if xsd_type == DATE_OR_DATETIME:
+        simple_type = etree.SubElement(definition, f"{XS}simpleType")
+        etree.SubElement(simple_type, f"{XS}union", memberTypes=xsd_type)
+    else:
+        definition.set("type", xsd_type)
+
+def emit_element(model, parent, optional_fields, is_root=False, in_choice=False):
+    """
+    Appends the xs:element declaration for model (and its children) to parent.
+
+    Declarations are emitted from an explicit stack in document order; each complex
+    type's group is created before its children are appended to it, so no recursion is
+    needed however deep the model is.
+
+    minOccurs and maxOccurs follow the model's occurrence flags, which the checksum
+    records, so the declaration fits every document that shares the checksum however
+    often its elements repeat.
+
+    Parameters:
+    - model (ElementModel): The inferred content model.
+    - parent (etree._Element): xs:schema, xs:sequence or xs:choice to append to.
+    - optional_fields (set): Element paths configured as optional.
+    - is_root (bool): Root declarations carry no occurrence constraints.
+    - in_choice (bool): Children of a repeated xs:choice carry no occurrence constraints.
+    """
+    # Each entry is (model, parent, is_root, in_choice)
+    stack = [(model, parent, is_root, in_choice)]
+    while stack:
+        model, parent, is_root, in_choice = stack.pop()
+        element_attrs = {"name": model.name}
+
+        if not is_root and not in_choice:
+            if model.path in optional_fields:
+                element_attrs["minOccurs"] = "0"
+                if _log.isEnabledFor(DEBUG):
+                    _log.debug("🔧 Making element '%s' optional (minOccurs=0)", model.path,
+                               extra={"event": "xsd.optional_element", "fields": {"path": model.path}})
+            elif model.sometimes_absent:
+                element_attrs["minOccurs"] = "0"
+            else:
+                element_attrs["minOccurs"] = "1"
+            if model.repeats:
+                element_attrs["maxOccurs"] = "unbounded"
+
+        element_def = etree.SubElement(parent, f"{XS}element", **element_attrs)
+
+        if model.is_complex:
+            complex_type_attrs = {}
+            if model.has_text:
+                complex_type_attrs["mixed"] = "true"
+
+            complex_type = etree.SubElement(element_def, f"{XS}complexType", **complex_type_attrs)
+            if model.ordered:
+                group = etree.SubElement(complex_type, f"{XS}sequence")
+            else:
+                group = etree.SubElement(complex_type, f"{XS}choice", minOccurs="0", maxOccurs="unbounded")
+
+            # Attributes follow the group; children are appended into the group later
+            for attr_name, accumulator in model.attributes.items():
+                attribute = etree.SubElement(complex_type, f"{XS}attribute", name=attr_name)
+                set_simple_type(attribute, accumulator.result() or "xs:string")
+
+            # Pushed in reverse so they are popped, and appended, in document order
+            for child_name in reversed(model.order):
+                stack.append((model.children[child_name], group, False, not model.ordered))
+        else:
+            text_type = model.text_type.result() if model.text_type is not None else None
+            set_simple_type(element_def, text_type or "xs:string")
+
+def build_xsd(root_model, optional_fields):
+    """
+    Builds the xs:schema document for an inferred content model.
+
+    Parameters:
+    - root_model (ElementModel): Model of the document's root element.
+    - optional_fields (set): Element paths configured as optional.
+
+    Returns:
+    - etree._Element: The xs:schema element.
+    """
+    xsd = etree.Element(f"{XS}schema", nsmap=NS_MAP)
+    emit_element(root_model, xsd, optional_fields, is_root=True)
+    return xsd
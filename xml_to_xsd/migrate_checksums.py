@@ -0,0 +1,64 @@
+import os
+import sys
+from .checksum_generator import get_xml_checksum, get_legacy_xml_checksum
+from .xml_parser import load_xml
+from .xsd_generator import generate_xsd_from_tree
+from schema_utils.config_index import resolve_config
+from schema_utils.disk_store import DiskStore
+
+# === Checksum Migration ===
+#
+# XML checksums used to record one path per element instance, so feeds with the same
+# structure but a different number of records got different checksums. They are now built
+# from the set of distinct paths plus per-path occurrence flags. Legacy XSDs declare every
+# element instance separately, so they only accept documents with exactly the same element
+# counts and cannot be reused under the new checksum, which is shared by feeds of any
+# length. For each file that had a legacy XSD this tool generates the XSD for its new
+# checksum instead, so that the cache keeps hitting. Old files are left in place.
+
+def migrate_xsd_schemas(xml_dir, xsd_path, config_path=None):
+    """
+    Generates the XSD under the new checksum for each file in xml_dir that has an XSD
+    stored under its legacy checksum.
+
+    Returns:
+    - list: (old_checksum, new_checksum) pairs that were migrated.
+    """
+    config = resolve_config(config_path)
+    store = DiskStore(xsd_path, ".xsd")
+    migrated = []
+    seen = set()
+
+    for xml_file_name in sorted(os.listdir(xml_dir)):
+        if not xml_file_name.endswith(".xml"):
+            continue
+        xml_path = os.path.join(xml_dir, xml_file_name)
+        loaded = load_xml(xml_path)
+        if loaded is None:
+            continue
+
+        xml_tree, root = loaded
+        optional_fields, allow_null_fields = config.get_fields(xml_file_name)
+        old_checksum = get_legacy_xml_checksum(root, optional_fields, allow_null_fields)
+        new_checksum = get_xml_checksum(root, optional_fields, allow_null_fields)
+        if old_checksum == new_checksum or (old_checksum, new_checksum) in seen:
+            continue
+        seen.add((old_checksum, new_checksum))
+
+        if not store.exists(old_checksum) or store.exists(new_checksum):
+            continue
+
+        generate_xsd_from_tree(xml_tree, xml_path, store, config, output="bytes", checksum=new_checksum)
+        migrated.append((old_checksum, new_checksum))
+
+    return migrated
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m xml_to_xsd.migrate_checksums <xml_dir> <xsd_dir> [config_file]")
+        sys.exit(1)
+
+    pairs = migrate_xsd_schemas(*sys.argv[1:4])
+    for old_checksum, new_checksum in pairs:
+        print(f"{old_checksum} -> {new_checksum}")
+    print(f"✅ Migrated {len(pairs)} schema(s).")
@@ -0,0 +1,31 @@
+from .xml_parser import load_xml
+from .xsd_generator import generate_xsd_from_tree
+from .xml_validator import validate_xml
+
+def xml_pipeline(xml_path, xsd_path, config_path=None, loaded=None, checksum=None, sample_limit=None):
+    """
+    Generates (or loads) the XSD for an XML file and validates the file against it,
+    parsing the file only once.
+
+    Parameters:
+    - xml_path (str): The path to the XML file.
+    - xsd_path (str | SchemaStore): XSD directory, .sqlite/.db database or SchemaStore.
+    - config_path (str | CompiledConfig): Optional config file path or compiled config.
+    - loaded (tuple): (xml_tree, root) from load_xml, if the file was already parsed.
+    - checksum (str): The document's checksum, if already computed.
+    - sample_limit (int): Cap on the values type-checked per path when the XSD is
+      generated; defaults to the file's "type_sample_limit" config option.
+
+    Returns:
+    - tuple: (schema, result) where schema is the compiled etree.XMLSchema,
+      or (None, False) if the file could not be parsed.
+    """
+    if loaded is None:
+        loaded = load_xml(xml_path)
+        if loaded is None:
+            return None, False
+
+    xml_tree, root = loaded
+    schema = generate_xsd_from_tree(xml_tree, xml_path, xsd_path, config_path, output="schema", checksum=checksum,
+                                    sample_limit=sample_limit)
+    return schema, validate_xml(xml_tree, schema)
@@ -1,9 +1,17 @@
 import re
 
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}([+-]\d{2}:\d{2}|Z)?$")
+DECIMAL_PATTERN = re.compile(r"^\d+\.\d+$")
+
 def infer_type(text):
     """
     Infers the XML Schema data type based on the text content.
 
+    Values are dispatched on their first character and length before any pattern is
+    tried: anything not starting with a digit is a string, and only values with a "-" at
+    index 4 can be dates.
+
     Parameters:
     - text (str): Text content of an XML element or attribute.
 
@@ -21,19 +29,125 @@ def infer_type(text):
         
     cleaned_text = text.strip('\'"')
 
-    date_pattern = r"^\d{4}-\d{2}-\d{2}$"
-    datetime_pattern = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}([+-]\d{2}:\d{2}|Z)?$"
-    
-    if re.match(date_pattern, cleaned_text):
-        return "xs:date"
-    elif re.match(datetime_pattern, cleaned_text):
-        return "xs:dateTime"
-    elif cleaned_text.isdigit():
+    # Every non-string type starts with a digit (\d is a subset of str.isdigit)
+    if not cleaned_text or not cleaned_text[0].isdigit():
+        return "xs:string"
+
+    if cleaned_text[4:5] == "-":
+        length = len(cleaned_text)
+        if length <= 11 and DATE_PATTERN.match(cleaned_text):
+            return "xs:date"
+        if length >= 19 and DATETIME_PATTERN.match(cleaned_text):
+            return "xs:dateTime"
+        return "xs:string"
+
+    if cleaned_text.isdigit():
         return "xs:integer"
-    elif re.match(r"^\d+\.\d+$", cleaned_text):
+    if "." in cleaned_text and DECIMAL_PATTERN.match(cleaned_text):
+        return "xs:decimal"
+    return "xs:string"
+
+def infer_types(values):
+    """
+    Classifies a batch of values, e.g. all texts collected for one element path.
+    Repeated values are classified once.
+
+    Parameters:
+    - values (iterable): Text contents or attribute values.
+
+    Returns:
+    - list: The inferred XSD type of each value, in order.
+    """
+    classified = {}
+    types = []
+    for value in values:
+        xsd_type = classified.get(value)
+        if xsd_type is None:
+            xsd_type = classified[value] = infer_type(value)
+        types.append(xsd_type)
+    return types
+
+DATE_OR_DATETIME = "xs:date xs:dateTime"
+
+def widen_type(current, new):
+    """
+    Returns the narrowest XSD type that accepts values of both types.
+
+    integer widens to decimal; date and dateTime widen to a union of both (a plain date
+    is not a valid xs:dateTime); any other mix widens to string.
+
+    Parameters:
+    - current (str | None): Type inferred so far, or None if no value was seen yet.
+    - new (str): Type of the next value.
+
+    Returns:
+    - str: The widened type. DATE_OR_DATETIME is a space separated union member list.
+    """
+    if current is None or current == new:
+        return new
+    pair = {current, new}
+    if pair == {"xs:integer", "xs:decimal"}:
         return "xs:decimal"
+    if pair <= {"xs:date", "xs:dateTime", DATE_OR_DATETIME}:
+        return DATE_OR_DATETIME
     return "xs:string"
 
+def infer_common_type(values, current=None):
+    """
+    Returns the widened type of a batch of values, starting from current.
+    Stops early once the type has widened to xs:string.
+    """
+    for value in set(values):
+        current = widen_type(current, infer_type(value))
+        if current == "xs:string":
+            break
+    return current
+
+class TypeAccumulator:
+    """
+    Incrementally widens the XSD type of all values seen for one element or attribute path.
+
+    Values are buffered (deduplicated) and classified in batches, so at most max_pending
+    distinct values are retained at any time; the running type is a point in the lattice
+    integer -> decimal -> string, date -> date|dateTime -> string. Once it reaches
+    xs:string further values are ignored, since nothing can widen it further.
+
+    Parameters:
+    - sample_limit (int): Optional cap on the number of values inspected per path. Values
+      past the cap are not classified, trading exactness for speed on uniform feeds.
+    - max_pending (int): Number of distinct buffered values that triggers a batch.
+    """
+
+    __slots__ = ("xsd_type", "pending", "seen", "sample_limit", "max_pending")
+
+    def __init__(self, sample_limit=None, max_pending=256):
+        self.xsd_type = None
+        self.pending = set()
+        self.seen = 0
+        self.sample_limit = sample_limit
+        self.max_pending = max_pending
+
+    def add(self, value):
+        if self.xsd_type == "xs:string":
+            return
+        if self.sample_limit is not None:
+            if self.seen >= self.sample_limit:
+                return
+            self.seen += 1
+        self.pending.add(value)
+        if len(self.pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.xsd_type = infer_common_type(self.pending, self.xsd_type)
+            self.pending.clear()
+
+    def result(self):
+        """Returns the widened type of every value added so far, or None if there were none."""
+        self.flush()
+        return self.xsd_type
+
 if __name__ == "__main__":
     test_strings = ["2023-11-27", "2023-11-27T21:30:00+08:00", "123", "true", "example text"]
     for text in test_strings:
@@ -1,4 +1,7 @@
 from lxml import etree
+from schema_utils.events import ERROR, get_logger, log_event
+
+_log = get_logger(__name__)
 
 def load_xml(xml_path):
     """
@@ -15,5 +18,5 @@ def load_xml(xml_path):
         root = tree.getroot()
         return tree, root
     except (etree.XMLSyntaxError, FileNotFoundError) as e:
-        print(f"Failed to load or parse XML file: {e}")
+        log_event(_log, ERROR, "input.invalid", "Failed to load or parse XML file: %s", e, file=xml_path)
         return None
\ No newline at end of file
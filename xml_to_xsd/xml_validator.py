@@ -1,16 +1,41 @@
 from lxml import etree
+from .xsd_cache import compile_xsd_string
+from schema_utils.events import WARNING, ERROR, get_logger, log_event
+
+_log = get_logger(__name__)
 
 def xml_validator(xml_path, xsd_str):
     try:
-        xsd_doc = etree.fromstring(xsd_str.encode())
-        schema = etree.XMLSchema(xsd_doc)
         xml_doc = etree.parse(xml_path)
+    except Exception as e:
+        log_event(_log, ERROR, "validation.error", "Error: %s", e, file=xml_path)
+        return False
+
+    return validate_xml(xml_doc, xsd_str)
+
+def validate_xml(xml_doc, xsd_str):
+    """
+    Validates an already parsed XML document against an XSD schema.
+
+    Parameters:
+    - xml_doc (etree.ElementTree): The parsed XML document.
+    - xsd_str (str | bytes | etree.XMLSchema): The XSD schema, or an already compiled
+      schema as returned by generate_xsd(..., output="schema").
+
+    Returns:
+    - bool: True if the document is valid.
+    """
+    try:
+        if isinstance(xsd_str, etree.XMLSchema):
+            schema = xsd_str
+        else:
+            schema = compile_xsd_string(xsd_str)
         schema.assertValid(xml_doc)
-        
+
         return True
     except etree.DocumentInvalid as e:
-        print("Validation failed:", e)
+        log_event(_log, WARNING, "validation.failed", "Validation failed: %s", e)
         return False
     except Exception as e:
-        print("Error:", e)
-        return False
\ No newline at end of file
+        log_event(_log, ERROR, "validation.error", "Error: %s", e)
+        return False
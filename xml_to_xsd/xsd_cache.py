@@ -0,0 +1,52 @@
+import hashlib
+from lxml import etree
+from schema_utils.lru_cache import LRUCache
+
+# (source bytes, compiled etree.XMLSchema) keyed by (store key, XSD checksum) or by a hash
+# of the XSD content, shared by every call in this process
+compiled_schema_cache = LRUCache(maxsize=64)
+
+def schema_key(store, checksum):
+    """
+    Returns the compiled schema cache key of checksum in store. Checksums are only unique
+    within one store, so two stores may hold different XSDs under the same checksum.
+    """
+    return (store.key, checksum)
+
+def get_compiled_schema(key, xsd_doc, source=None):
+    """
+    Returns the compiled schema for key, compiling xsd_doc on a cache miss.
+
+    A cached schema compiled from other source bytes is compiled again. The bytes come
+    from the SchemaCache, which returns the same object until its entry expires or is
+    replaced, so this is normally an identity check; an XSD that changed in the store
+    is picked up as soon as the SchemaCache re-reads it.
+
+    Parameters:
+    - key (tuple | str): schema_key(store, checksum), or a hash of the XSD content.
+    - xsd_doc (etree._Element | etree._ElementTree | callable): The parsed XSD, or a
+      callable returning it so that a cache hit never needs to load the document.
+    - source (bytes): The XSD file content xsd_doc was parsed from, if known.
+
+    Returns:
+    - etree.XMLSchema: The compiled schema.
+    """
+    entry = compiled_schema_cache.get(key)
+    if entry is not None and (source is None or entry[0] is source or entry[0] == source):
+        return entry[1]
+    doc = xsd_doc() if callable(xsd_doc) else xsd_doc
+    schema = etree.XMLSchema(doc)
+    compiled_schema_cache.put(key, (source, schema))
+    return schema
+
+def compile_xsd_string(xsd_str):
+    """
+    Returns the compiled schema for an XSD string, keyed by a hash of its content.
+    """
+    xsd_bytes = xsd_str.encode() if isinstance(xsd_str, str) else xsd_str
+    content_hash = hashlib.sha256(xsd_bytes).hexdigest()
+    return get_compiled_schema(content_hash, lambda: etree.fromstring(xsd_bytes))
+
+def get_schema_cache_stats():
+    """Returns size, hit, miss and eviction counters of the compiled schema cache."""
+    return compiled_schema_cache.stats()
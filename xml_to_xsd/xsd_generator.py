@@ -1,106 +1,260 @@
-import json
 import os
 from lxml import etree
 from .xml_parser import load_xml
-from .schema_inferer import infer_type
-from .checksum_generator import get_xml_checksum
+from .checksum_generator import generate_checksum_from_elements, get_xml_checksum, get_xml_checksum_streaming
+from .content_model import build_xsd, emit_element, infer_model_from_element, infer_model_streaming, model_paths
+from .xsd_cache import get_compiled_schema, schema_key
+from schema_utils.config_index import resolve_config
+from schema_utils.events import INFO, WARNING, ERROR, get_logger, log_event
+from schema_utils.schema_cache import get_schema_cache
+from schema_utils.schema_store import open_store
+from schema_utils.single_flight import schema_generation
 
-NS_MAP = {"xs": "http://www.w3.org/2001/XMLSchema"}
+_log = get_logger(__name__)
 
-def load_config(config_path):
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"⚠️ Warning: Could not load config file {config_path}: {e}")
-        return []
-
-def get_optional_fields_for_file(config, xml_file_name):
-    for config_entry in config:
-        if config_entry.get("file") == xml_file_name:
-            return set(config_entry.get("optional_fields", []))
-    return set()
-
-def get_allow_null_fields_for_file(config, xml_file_name):
-    for config_entry in config:
-        if config_entry.get("file") == xml_file_name:
-            return set(config_entry.get("allow_null_fields", []))
-    return set()
-
-def get_current_element_path(current_path, element_name):
-    return ".".join(current_path + [element_name])
+NS_MAP = {"xs": "http://www.w3.org/2001/XMLSchema"}
+XSD_ROOT = "{http://www.w3.org/2001/XMLSchema}schema"
+XSD_OUTPUTS = ("str", "bytes", "schema")
 
 def process_element(element, parent, optional_fields, current_path, is_root=False):
-    ns = "{http://www.w3.org/2001/XMLSchema}"
-    tag = element.tag() if callable(element.tag) else element.tag
-    element_name = str(tag).split('}')[-1]
+    """
+    Appends the xs:element declaration for element to parent.
 
-    element_path = get_current_element_path(current_path, element_name)
+    Repeated siblings are aggregated by tag into a single declaration with
+    maxOccurs="unbounded" whose content model is the union of all instances, so the XSD
+    grows with the document's structure rather than its record count.
 
-    element_attrs = {"name": element_name}
+    Parameters:
+    - element (etree._Element): The XML element to describe.
+    - parent (etree._Element): xs:schema or xs:sequence to append to.
+    - optional_fields (set): Element paths configured as optional.
+    - current_path (list): Names of the element's ancestors.
+    - is_root (bool): Whether element is the document root.
+    """
+    if not isinstance(element.tag, str):
+        # Comments and processing instructions carry no structure
+        return
+    model = infer_model_from_element(element, ".".join(current_path))
+    emit_element(model, parent, optional_fields, is_root=is_root)
 
-    if not is_root:
-        if element_path in optional_fields:
-            element_attrs["minOccurs"] = "0"
-            print(f"🔧 Making element '{element_path}' optional (minOccurs=0)")
-        else:
-            element_attrs["minOccurs"] = "1"
+def resolve_sample_limit(config, xml_file_name, sample_limit=None):
+    """
+    Returns the cap on values type-checked per path during inference: sample_limit if
+    given, otherwise the file's "type_sample_limit" config option. None (the default)
+    type-checks every value; invalid settings are ignored with a warning.
+    """
+    if sample_limit is None:
+        sample_limit = config.get_file_config(xml_file_name).get("type_sample_limit")
+        if sample_limit is None:
+            return None
+    try:
+        limit = int(sample_limit)
+        if limit < 1:
+            raise ValueError("must be at least 1")
+    except (TypeError, ValueError) as e:
+        log_event(_log, WARNING, "config.invalid_sample_limit", "⚠️ Warning: Ignoring invalid type_sample_limit %r: %s",
+                  sample_limit, e, file=xml_file_name)
+        return None
+    return limit
 
-    element_def = etree.SubElement(parent, f"{ns}element", **element_attrs)
+def generate_xsd(xml_path, xsd_path, config_path=None, output="str", streaming=False, sample_limit=None,
+                 single_pass=False):
+    """
+    Generates (or loads) the XSD for an XML file. sample_limit caps the values
+    type-checked per path, overriding the file's "type_sample_limit" config option.
 
-    has_children = len(element) > 0
-    has_attributes = len(element.attrib) > 0
-    has_text = element.text is not None and element.text.strip() != ""
+    With streaming=True the tree is never built. The checksum comes from a cheap
+    etree.iterparse fingerprint, and only on a cache miss is the file streamed a second
+    time to infer the content model. On a hit (the common case) the model would be
+    thrown away, and inferring it costs noticeably more than the fingerprint.
 
-    if has_children or has_attributes:
-        complex_type_attrs = {}
-        if has_text:
-            complex_type_attrs["mixed"] = "true"
+    With single_pass=True the content model is inferred up front and the checksum is
+    derived from it (see generate_xsd_from_model), so a miss reads the document once
+    instead of twice. Use it where most lookups miss, e.g. to fill a cold cache; on
+    hits it costs more than the default.
+    """
+    if streaming:
+        config = resolve_config(config_path)
+        xml_file_name = os.path.basename(xml_path)
+        optional_fields, allow_null_fields = config.get_fields(xml_file_name)
+        sample_limit = resolve_sample_limit(config, xml_file_name, sample_limit)
+        try:
+            if single_pass:
+                model = infer_model_streaming(xml_path, sample_limit)
+            else:
+                checksum = get_xml_checksum_streaming(xml_path, optional_fields, allow_null_fields)
+        except (etree.XMLSyntaxError, OSError) as e:
+            log_event(_log, ERROR, "input.invalid", "Failed to load or parse XML file: %s", e, file=xml_path)
+            log_event(_log, ERROR, "input.invalid", "❌ Failed to parse XML.", file=xml_path)
+            return "Failed to generate XSD schema."
+        if single_pass:
+            return generate_xsd_from_model(model, xml_path, xsd_path, config, output)
+        return resolve_xsd(checksum, lambda: infer_model_streaming(xml_path, sample_limit), xml_path, xsd_path,
+                           optional_fields, output)
 
-        complex_type = etree.SubElement(element_def, f"{ns}complexType", **complex_type_attrs)
-        sequence = etree.SubElement(complex_type, f"{ns}sequence")
+    loaded = load_xml(xml_path)
+    if loaded is None:
+        log_event(_log, ERROR, "input.invalid", "❌ Failed to parse XML.", file=xml_path)
+        return "Failed to generate XSD schema."
+    xml_tree, root = loaded
+    return generate_xsd_from_tree(xml_tree, xml_path, xsd_path, config_path, output, sample_limit=sample_limit,
+                                  single_pass=single_pass)
 
-        current_path.append(element_name)
-        for child in element:
-            process_element(child, sequence, optional_fields, current_path, is_root=False)
-        current_path.pop()
+def generate_xsd_from_tree(xml_tree, xml_path, xsd_path, config_path=None, output="str", checksum=None,
+                           sample_limit=None, single_pass=False):
+    """
+    Generates (or loads) the XSD for an already parsed XML document.
 
-        for attr_name, attr_value in element.attrib.items():
-            attr_type = infer_type(attr_value)
-            etree.SubElement(complex_type, f"{ns}attribute", name=attr_name, type=attr_type)
-    else:
-        element_def.set("type", infer_type(element.text))
+    The checksum comes from a cheap path walk; the content model is only inferred on a
+    cache miss, since on a hit (the common case) it would be thrown away. With
+    single_pass=True the model is inferred first and the checksum derived from it, so
+    the tree is walked once whether or not the lookup misses.
 
-def generate_xsd(xml_path, xsd_path, config_path=None):
-    config = load_config(config_path) if config_path else []
+    Parameters:
+    - xml_tree (etree.ElementTree): The parsed XML document.
+    - xml_path (str): Path the document was read from, used for config lookup.
+    - xsd_path (str | SchemaStore): Directory holding the checksum-named XSD files, a
+      .sqlite/.sqlite3/.db database, or a SchemaStore instance.
+    - config_path (str | CompiledConfig): Optional config file path, loaded once per
+      process and reloaded when it changes, or an already compiled config.
+    - output (str): "str" returns the XSD text, "bytes" the raw XSD file content and
+      "schema" the compiled etree.XMLSchema from the shared cache. Cached XSDs are
+      returned as stored, without being parsed and serialised again.
+    - checksum (str): The document's checksum, if already computed.
+    - sample_limit (int): Cap on the values type-checked per path on a cache miss;
+      defaults to the file's "type_sample_limit" config option.
+    - single_pass (bool): Infer the model up front and derive the checksum from it;
+      ignored if checksum is given.
 
+    Returns:
+    - str | bytes | etree.XMLSchema: The XSD schema.
+    """
     xml_file_name = os.path.basename(xml_path)
-    optional_fields = get_optional_fields_for_file(config, xml_file_name)
-    allow_null_fields = get_allow_null_fields_for_file(config, xml_file_name)
+    config = resolve_config(config_path)
+    optional_fields, allow_null_fields = config.get_fields(xml_file_name)
+    sample_limit = resolve_sample_limit(config, xml_file_name, sample_limit)
+
+    root = xml_tree.getroot()
+    if single_pass and checksum is None:
+        return generate_xsd_from_model(infer_model_from_element(root, sample_limit=sample_limit), xml_path,
+                                       xsd_path, config, output)
+    if checksum is None:
+        checksum = get_xml_checksum(root, optional_fields, allow_null_fields)
+    return resolve_xsd(checksum, lambda: infer_model_from_element(root, sample_limit=sample_limit), xml_path,
+                       xsd_path, optional_fields, output)
+
+def generate_xsd_from_model(model, xml_path, xsd_path, config_path=None, output="str"):
+    """
+    Generates (or loads) the XSD for a document whose content model was already inferred,
+    e.g. by infer_model_streaming. The checksum is derived from the model itself
+    (model_paths equals the path set of the document), so the document is not read again.
+
+    Parameters:
+    - model (ElementModel): Content model of the document's root element.
+    - xml_path (str): Path the document was read from, used for config lookup.
+    - xsd_path (str | SchemaStore): XSD directory, database or store, as for generate_xsd_from_tree.
+    - config_path (str | CompiledConfig): Optional config file path or compiled config.
+    - output (str): "str", "bytes" or "schema", as for generate_xsd_from_tree.
+
+    Returns:
+    - str | bytes | etree.XMLSchema: The XSD schema.
+    """
+    optional_fields, allow_null_fields = resolve_config(config_path).get_fields(os.path.basename(xml_path))
+    checksum = generate_checksum_from_elements(model_paths(model), optional_fields, allow_null_fields)
+    return resolve_xsd(checksum, lambda: model, xml_path, xsd_path, optional_fields, output)
+
+def resolve_xsd(checksum, get_model, xml_path, xsd_path, optional_fields, output):
+    """
+    Returns the XSD stored for checksum, or builds it from get_model() and stores it.
+    """
+    if output not in XSD_OUTPUTS:
+        raise ValueError(f"Unknown XSD output {output!r}, expected one of {XSD_OUTPUTS}")
 
-    xml_tree, root = load_xml(xml_path)
-    checksum = get_xml_checksum(root, optional_fields, allow_null_fields)
-    xsd_file_path = f"{xsd_path}/{checksum}.xsd"
+    store = open_store(xsd_path, ".xsd")
+    schema_cache = get_schema_cache()
+    xsd_file_path = store.path_for(checksum)
 
-    print(f"📄 XML: {xml_path} | 📁 XSD: {xsd_file_path}")
+    log_event(_log, INFO, "schema.lookup", "📄 XML: %s | 📁 XSD: %s", xml_path, xsd_file_path,
+              file=xml_path, checksum=checksum)
     if optional_fields:
-        print(f"🔧 Optional fields: {list(optional_fields)}")
+        log_event(_log, INFO, "config.optional_fields", "🔧 Optional fields: %s", list(optional_fields),
+                  optional_fields=list(optional_fields))
 
+    # Compiled schemas are looked up through the SchemaCache entry they were compiled
+    # from, so its TTL and replacements apply to them too
+    result = load_cached_xsd(schema_cache, store, checksum, output)
+    if result is not None:
+        return result
+
+    def generate():
+        # Only one process generates a given checksum; the others wait and then load its result
+        with store.lock(checksum):
+            # Another process may have stored it meanwhile. Only reuse an entry that
+            # compiles; anything else is regenerated and overwritten.
+            try:
+                xsd_bytes = schema_cache.load(store, checksum, check_xsd_bytes)
+                if xsd_bytes is not None:
+                    format_xsd_output(schema_key(store, checksum), xsd_bytes, "schema")
+                    log_event(_log, INFO, "schema.hit", "✅ Existing schema loaded.", checksum=checksum)
+                    return xsd_bytes, None
+            except (OSError, ValueError, etree.LxmlError):
+                # Already reported by the lookup outside the lock
+                pass
+
+            xsd = build_xsd(get_model(), optional_fields)
+
+            xsd_bytes = etree.tostring(xsd, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+            schema_cache.save(store, checksum, xsd_bytes)
+            log_event(_log, INFO, "schema.generated", "✅ New schema generated and saved.", checksum=checksum)
+            return xsd_bytes, xsd
+
+    # Threads of this process missing on the same checksum share one generation
+    xsd_bytes, xsd = schema_generation.do((store.key, checksum), generate)
+    if output == "schema" and xsd is not None:
+        return get_compiled_schema(schema_key(store, checksum), xsd, xsd_bytes)
+    return format_xsd_output(schema_key(store, checksum), xsd_bytes, output)
+
+def load_cached_xsd(schema_cache, store, checksum, output):
+    """
+    Returns the stored XSD for checksum in the requested output form, or None on a miss.
+    Unreadable or corrupt entries are logged and count as misses, so they get regenerated.
+    """
     try:
-        with open(xsd_file_path, "rb") as f:
-            existing_schema = etree.parse(f)
-            print("✅ Existing schema loaded.")
-            return etree.tostring(existing_schema, pretty_print=True, encoding="utf-8").decode()
-    except:
-        if xml_tree is not None:
-            xsd = etree.Element("{http://www.w3.org/2001/XMLSchema}schema", nsmap=NS_MAP)
-            process_element(xml_tree.getroot(), xsd, optional_fields, [], is_root=True)
-
-            xsd_str = etree.tostring(xsd, pretty_print=True, xml_declaration=True, encoding="UTF-8").decode()
-            with open(xsd_file_path, "w", encoding="utf-8") as f:
-                f.write(xsd_str)
-                print("✅ New schema generated and saved.")
-            return xsd_str
-        else:
-            print("❌ Failed to parse XML.")
-            return "Failed to generate XSD schema."
\ No newline at end of file
+        xsd_bytes = schema_cache.load(store, checksum, check_xsd_bytes)
+        if xsd_bytes is None:
+            return None
+        result = format_xsd_output(schema_key(store, checksum), xsd_bytes, output)
+    except (OSError, ValueError, etree.LxmlError) as e:
+        log_event(_log, WARNING, "schema.read_failed", "⚠️ Warning: Ignoring unreadable schema: %s", e,
+                  checksum=checksum)
+        return None
+    log_event(_log, INFO, "schema.hit", "✅ Existing schema loaded.", checksum=checksum)
+    return result
+
+def check_xsd_bytes(xsd_bytes):
+    """
+    Returns xsd_bytes if they parse to an xs:schema document, and raises otherwise.
+
+    Used as the SchemaCache decode step, so a stored XSD is checked when it is read from
+    the store, not on every memory hit; truncated files and other documents raise and
+    count as misses.
+    """
+    root = etree.fromstring(xsd_bytes)
+    if root.tag != XSD_ROOT:
+        raise ValueError(f"Not an XSD document: root element is {root.tag!r}")
+    return xsd_bytes
+
+def format_xsd_output(key, xsd_bytes, output):
+    """
+    Converts raw XSD file bytes into the requested output form without re-serialising.
+
+    Parameters:
+    - key (tuple): schema_key(store, checksum), used as the compiled schema cache key.
+    - xsd_bytes (bytes): The XSD document as stored on disk.
+    - output (str): "str", "bytes" or "schema".
+    """
+    if output == "bytes":
+        return xsd_bytes
+    if output == "schema":
+        return get_compiled_schema(key, lambda: etree.fromstring(xsd_bytes), xsd_bytes)
+    return xsd_bytes.decode("utf-8")